@@ -0,0 +1,198 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from GraphLib.GraphIO import GraphIO, BINARY_EXTENSION
+from Partitioning import Partitioning, METHODS
+from PartitioningLib.Budget import Budget
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def _init_batch_worker(memory_limit):
+    """
+    Method limits address space of worker process, so a huge graph fails its own task instead of the machine.
+    :param memory_limit: limit in bytes, None for no limit
+    """
+    if memory_limit is not None and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+
+def _batch_task(task):
+    """
+    Method partitions one graph file, errors are returned in the result instead of being raised.
+    :param task: (path, method, sizes, seed, params, timeout, binary_cache)
+    :return: result dict
+    """
+    path, method, sizes, seed, params, timeout, binary_cache = task
+    result = {"input": path, "method": method, "sizes": sizes, "seed": seed, "params": params}
+    try:
+        start = time.perf_counter()
+        graph = GraphIO.load(path, cache=binary_cache)
+        result["load_time"] = time.perf_counter() - start
+        budget = Budget(seconds=timeout) if timeout is not None else None
+        bis = Partitioning(graph, sizes, seed=seed, budget=budget)
+        start = time.perf_counter()
+        result["cut"] = bis.run(method, **params)
+        result["time"] = time.perf_counter() - start
+        result["n"] = graph.get_n()
+        result["m"] = graph.get_m()
+        result["labels"] = bis.get_labels()
+    except Exception as e:
+        result["error"] = "{}: {}".format(type(e).__name__, e)
+    return result
+
+
+class BatchPartitioning(object):
+    """
+    Partitioning of many graph files by one method, in a pool of worker processes.
+    Every result is appended to JSONL output as soon as its task finishes, one line per graph.
+    Inputs which already have a result without error for the same method, sizes, seed and parameters
+    are skipped, so an interrupted batch is resumed by running it again with the same output.
+    """
+
+    def __init__(self, inputs, output, method, sizes=None, seed=0, params=None, workers=1, tasks_per_worker=None,
+                 memory_limit=None, timeout=None, binary_cache=False):
+        """
+        :param inputs: directory of graph files or manifest file with one path per line
+        :param output: path of JSONL results file
+        :param method: one of Partitioning METHODS
+        :param sizes: partitions sizes in percents
+        :param seed: seed of every run
+        :param params: dict of keyword arguments of the method
+        :param workers: number of worker processes, all cores if None, with 1 tasks run in this process
+        unless memory_limit or tasks_per_worker is given
+        :param tasks_per_worker: worker process is replaced after that many graphs, None keeps workers
+        :param memory_limit: address space limit of every worker in bytes, None for no limit
+        :param timeout: time budget of every run in seconds, None for no limit
+        :param binary_cache: cache parsed text graphs as binary files next to them, see GraphIO.load
+        """
+        assert method in METHODS, "Unknown method {}".format(method)
+        self.__inputs = inputs
+        self.__output = output
+        self.__method = method
+        self.__sizes = sizes if sizes is not None else [50, 50]
+        self.__seed = seed
+        self.__params = params if params is not None else {}
+        self.__workers = workers if workers is not None else os.cpu_count()
+        self.__tasks_per_worker = tasks_per_worker
+        assert memory_limit is None or resource is not None, "Memory limit isn't supported on this platform"
+        self.__memory_limit = memory_limit
+        self.__timeout = timeout
+        self.__binary_cache = binary_cache
+
+    def get_inputs(self):
+        """
+        Method lists graph files: files of the directory in name order, skipping binary caches of other files,
+        or paths from the manifest, relative paths are relative to the manifest directory.
+        :return: list of paths
+        """
+        if os.path.isdir(self.__inputs):
+            names = sorted(os.listdir(self.__inputs))
+            paths = [os.path.join(self.__inputs, name) for name in names
+                     if not name.startswith(".") and not (name.endswith(BINARY_EXTENSION)
+                                                          and name[:-len(BINARY_EXTENSION)] in names)]
+            return [path for path in paths if os.path.isfile(path)]
+        base = os.path.dirname(self.__inputs)
+        with open(self.__inputs) as f:
+            lines = [line.strip() for line in f]
+        return [os.path.join(base, line) for line in lines if line and not line.startswith("#")]
+
+    def __key(self, path, method, sizes, seed, params):
+        return json.dumps([os.path.abspath(path), method, sizes, seed, params], sort_keys=True)
+
+    def get_done(self):
+        """
+        Method reads keys of successful results from output, a line cut by interruption is ignored.
+        :return: set of keys
+        """
+        done = set()
+        if not os.path.exists(self.__output):
+            return done
+        with open(self.__output) as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except ValueError:
+                    continue
+                if "error" not in result:
+                    done.add(self.__key(result["input"], result["method"], result["sizes"], result["seed"],
+                                        result["params"]))
+        return done
+
+    def run(self):
+        """
+        Method partitions all inputs without results.
+        :return: number of results written, number of errors among them
+        """
+        done = self.get_done()
+        tasks = [(path, self.__method, self.__sizes, self.__seed, self.__params, self.__timeout, self.__binary_cache)
+                 for path in self.get_inputs()
+                 if self.__key(path, self.__method, self.__sizes, self.__seed, self.__params) not in done]
+        written, errors = 0, 0
+        with open(self.__output, "a+") as out:
+            # line cut by interruption is finished, so the next result starts in a new line
+            out.seek(0, os.SEEK_END)
+            if out.tell() > 0:
+                out.seek(out.tell() - 1)
+                if out.read(1) != "\n":
+                    out.write("\n")
+            for result in self.__results(tasks):
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+                written += 1
+                errors += "error" in result
+        return written, errors
+
+    def __results(self, tasks):
+        # memory limit and worker replacement need worker processes, the batch process itself is never limited
+        if self.__workers == 1 and self.__memory_limit is None and self.__tasks_per_worker is None:
+            for task in tasks:
+                yield _batch_task(task)
+            return
+        # leaving the pool terminates tasks which are still running
+        with multiprocessing.Pool(self.__workers, _init_batch_worker, (self.__memory_limit,),
+                                  self.__tasks_per_worker) as pool:
+            for result in pool.imap_unordered(_batch_task, tasks):
+                yield result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Partition every graph of a directory or manifest, "
+                                                 "results are appended to JSONL file")
+    parser.add_argument("inputs", help="directory of graph files or manifest file with one path per line")
+    parser.add_argument("output", help="JSONL results file, inputs with results in it are skipped")
+    parser.add_argument("--method", default="kla", choices=METHODS)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 50], help="partitions sizes in percents")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=VALUE",
+                        help="keyword argument of the method, VALUE is parsed as JSON if possible")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes, all cores by default")
+    parser.add_argument("--tasks-per-worker", type=int, default=None,
+                        help="replace worker process after that many graphs")
+    parser.add_argument("--memory-limit", type=int, default=None, help="address space limit of a worker in MB")
+    parser.add_argument("--timeout", type=float, default=None, help="time budget of one graph in seconds")
+    parser.add_argument("--binary-cache", action="store_true", help="cache parsed graphs as binary files")
+    args = parser.parse_args(argv)
+    params = {}
+    for param in args.param:
+        name, _, value = param.partition("=")
+        try:
+            params[name] = json.loads(value)
+        except ValueError:
+            params[name] = value
+    memory_limit = args.memory_limit * 2 ** 20 if args.memory_limit is not None else None
+    batch = BatchPartitioning(args.inputs, args.output, args.method, args.sizes, args.seed, params, args.workers,
+                              args.tasks_per_worker, memory_limit, args.timeout, args.binary_cache)
+    written, errors = batch.run()
+    print("{} results written, {} errors".format(written, errors), file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+from GraphLib.SubgraphView import SubgraphView
+from GraphLib.Graph import Vertex, ADD_VERTEX, REMOVE_VERTEX, ADD_EDGE, REMOVE_EDGE
+
+
+class BitsetGraph(object):
+    """
+    Dense graph with every adjacency matrix row stored as a bitset in Python int,
+    bit j of row i is set when vertices with indices i and j are connected.
+    It takes n^2 / 8 bytes instead of 8 bytes per cell of Graph's lists, and counting neighbours
+    inside a set of vertices is a popcount of row AND set's mask, see get_mask and count_neighbours.
+    Public API is the same as Graph's.
+    """
+
+    def __init__(self, n):
+        self.__n = n
+        self.__m = 0
+        self.__rows = [0] * n
+        self.__vertices = [Vertex(-1) for _ in range(n)]
+        self.__index = {vertex: i for i, vertex in enumerate(self.__vertices)}
+        self.__changes = []
+
+    @classmethod
+    def from_edges(cls, n, edges):
+        """
+        Method creates graph with n vertices from iterable of (index, index) pairs.
+        :param n:
+        :param edges:
+        :return: BitsetGraph
+        """
+        graph = cls(n)
+        rows = graph.__rows
+        for i, j in edges:
+            assert not rows[i] >> j & 1, "Edge exists!"
+            rows[i] |= 1 << j
+            rows[j] |= 1 << i
+            graph.__m += 1
+        return graph
+
+    def __str__(self):
+        txt = "Graph with {} vertices\nAnd {} edges\n".format(self.__n, self.__m)
+        for row in self.__rows:
+            txt += "".join(str(row >> j & 1) for j in range(self.__n))
+            txt += "\n"
+        return txt
+
+    def get_subgraph(self, vertex_set):
+        """
+        Method returns induced subgraph as a view sharing this graph's rows, see SubgraphView.
+        :param vertex_set:
+        :return: SubgraphView
+        """
+        return SubgraphView(self, vertex_set)
+
+    def add_vertex(self, v):
+        self.__n += 1
+        self.__index[v] = len(self.__vertices)
+        self.__vertices.append(v)
+        self.__rows.append(0)
+        self.__changes.append((ADD_VERTEX, v))
+        return self.__n
+
+    def remove_vertex(self, v):
+        """
+        Method removes v with its edges, indices of vertices after v decrease by one.
+        Removal of every edge is logged before removal of the vertex.
+        :param v:
+        :return:
+        """
+        for neigh in self.get_neighbours(v):
+            self.remove_edge(v, neigh)
+        index = self.__index.pop(v)
+        self.__n -= 1
+        del self.__vertices[index]
+        del self.__rows[index]
+        low = (1 << index) - 1
+        # bits above index move one position down
+        self.__rows = [row & low | row >> (index + 1) << index for row in self.__rows]
+        for i in range(index, self.__n):
+            self.__index[self.__vertices[i]] = i
+        self.__changes.append((REMOVE_VERTEX, v, index))
+
+    def add_edge(self, v1, v2):
+        index_v1 = self.__index[v1]
+        index_v2 = self.__index[v2]
+        assert not self.__rows[index_v1] >> index_v2 & 1, "Edge exists!"
+        self.__m += 1
+        self.__rows[index_v1] |= 1 << index_v2
+        self.__rows[index_v2] |= 1 << index_v1
+        self.__changes.append((ADD_EDGE, v1, v2))
+
+    def remove_edge(self, v1, v2):
+        index_v1 = self.__index[v1]
+        index_v2 = self.__index[v2]
+        assert self.__rows[index_v1] >> index_v2 & 1, "Edge doesn't exist!"
+        self.__m -= 1
+        self.__rows[index_v1] &= ~(1 << index_v2)
+        self.__rows[index_v2] &= ~(1 << index_v1)
+        self.__changes.append((REMOVE_EDGE, v1, v2))
+
+    def get_version(self):
+        """
+        Method returns number of changes in change log, it identifies current state of the graph.
+        :return:
+        """
+        return len(self.__changes)
+
+    def get_changes(self, since=0):
+        """
+        Method returns changes made after given version, as (kind, vertex) or (kind, vertex, vertex) tuples,
+        removal of a vertex is (kind, vertex, its index before removal).
+        :param since: version returned by get_version
+        :return: list of changes
+        """
+        return self.__changes[since:]
+
+    def has_vertex(self, v):
+        return v in self.__index
+
+    def get_vertices(self):
+        return self.__vertices
+
+    def is_connected(self, v1, v2):
+        """
+        Method checks if there is an edge connecting v1 and v2.
+        Returns false if v1 and v2 are the same vertex.
+        :param v1:
+        :param v2:
+        :return:
+        """
+        return bool(self.__rows[self.__index[v1]] >> self.__index[v2] & 1)
+
+    def get_degree(self, v):
+        return self.__rows[self.__index[v]].bit_count()
+
+    def get_row(self, index):
+        """
+        :param index:
+        :return: bitset of neighbours indices of vertex with given index
+        """
+        return self.__rows[index]
+
+    def get_mask(self, vertices):
+        """
+        :param vertices: iterable of vertices
+        :return: bitset of vertices indices
+        """
+        mask = 0
+        for vertex in vertices:
+            mask |= 1 << self.__index[vertex]
+        return mask
+
+    def count_neighbours(self, v, mask):
+        """
+        Method counts neighbours of v among vertices in mask.
+        :param v:
+        :param mask: bitset of vertices indices, see get_mask
+        :return:
+        """
+        return (self.__rows[self.__index[v]] & mask).bit_count()
+
+    def get_neighbour_indices(self, index):
+        row = self.__rows[index]
+        neighbours = []
+        while row:
+            low = row & -row
+            neighbours.append(low.bit_length() - 1)
+            row ^= low
+        return neighbours
+
+    def get_neighbours(self, v):
+        return [self.__vertices[i] for i in self.get_neighbour_indices(self.__index[v])]
+
+    def get_not_neighbours(self, v):
+        row = self.__rows[self.__index[v]]
+        return [vertex for i, vertex in enumerate(self.__vertices) if not row >> i & 1]
+
+    def get_n(self):
+        return self.__n
+
+    def get_m(self):
+        return self.__m
+
+    def get_vertex_index(self, v):
+        return self.__index[v]
+
+    def get_vertex(self, index):
+        return self.__vertices[index]
+
+    def get_complement(self):
+        """
+        Method returns complement graph as a copy, every row is flipped with one XOR.
+        :return: BitsetGraph
+        """
+        rev = BitsetGraph(0)
+        rev.__vertices = list(self.__vertices)
+        rev.__index = dict(self.__index)
+        rev.__n = self.__n
+        rev.__m = self.__n * (self.__n - 1) // 2 - self.__m
+        full = (1 << self.__n) - 1
+        rev.__rows = [row ^ full ^ 1 << i for i, row in enumerate(self.__rows)]
+        return rev
@@ -0,0 +1,88 @@
+from GraphLib.Graph import ADD_EDGE, REMOVE_EDGE
+from GraphLib.SubgraphView import SubgraphView
+
+# change kinds of the complement of a graph change
+COMPLEMENT_CHANGES = {ADD_EDGE: REMOVE_EDGE, REMOVE_EDGE: ADD_EDGE}
+
+
+class ComplementView(object):
+    """
+    Read-only complement of a graph derived from the graph on demand, nothing is copied.
+    Degree and edge checks cost the same as in the original graph, listing neighbours costs O(n).
+    Complement of a sparse graph is dense, so the view lets max-bisection work on it in O(n + m) memory.
+    Public API is the same as Graph's without modifying methods.
+    """
+
+    def __init__(self, graph):
+        """
+        :param graph: graph of any backend
+        """
+        self.__graph = graph
+
+    def __str__(self):
+        txt = "Graph with {} vertices\nAnd {} edges\n".format(self.get_n(), self.get_m())
+        for i in range(self.get_n()):
+            txt += "{}: {}\n".format(i, " ".join(str(j) for j in self.get_neighbour_indices(i)))
+        return txt
+
+    def get_complement(self):
+        return self.__graph
+
+    def get_subgraph(self, vertex_set):
+        return SubgraphView(self, vertex_set)
+
+    def get_version(self):
+        return self.__graph.get_version()
+
+    def get_changes(self, since=0):
+        """
+        Method returns changes of the original graph with added and removed edges swapped.
+        :param since: version returned by get_version
+        :return: list of changes
+        """
+        return [(COMPLEMENT_CHANGES.get(change[0], change[0]),) + change[1:]
+                for change in self.__graph.get_changes(since)]
+
+    def has_vertex(self, v):
+        return self.__graph.has_vertex(v)
+
+    def get_vertices(self):
+        return self.__graph.get_vertices()
+
+    def is_connected(self, v1, v2):
+        """
+        Method checks if there is an edge connecting v1 and v2.
+        Returns false if v1 and v2 are the same vertex.
+        :param v1:
+        :param v2:
+        :return:
+        """
+        return v1 is not v2 and not self.__graph.is_connected(v1, v2)
+
+    def get_degree(self, v):
+        return self.__graph.get_n() - 1 - self.__graph.get_degree(v)
+
+    def get_neighbour_indices(self, index):
+        neighbours = set(self.__graph.get_neighbour_indices(index))
+        neighbours.add(index)
+        return [j for j in range(self.__graph.get_n()) if j not in neighbours]
+
+    def get_neighbours(self, v):
+        vertices = self.__graph.get_vertices()
+        return [vertices[j] for j in self.get_neighbour_indices(self.__graph.get_vertex_index(v))]
+
+    def get_not_neighbours(self, v):
+        return self.__graph.get_neighbours(v) + [v]
+
+    def get_n(self):
+        return self.__graph.get_n()
+
+    def get_m(self):
+        n = self.__graph.get_n()
+        return n * (n - 1) // 2 - self.__graph.get_m()
+
+    def get_vertex_index(self, v):
+        return self.__graph.get_vertex_index(v)
+
+    def get_vertex(self, index):
+        return self.__graph.get_vertex(index)
@@ -1,8 +1,18 @@
+from GraphLib.SubgraphView import SubgraphView
+
 NOT_CONNECTED = 0
 CONNECTED = 1
 
+# kinds of graph changes kept in change log
+ADD_VERTEX = "add_vertex"
+REMOVE_VERTEX = "remove_vertex"
+ADD_EDGE = "add_edge"
+REMOVE_EDGE = "remove_edge"
+
 
 class Vertex(object):
+    __slots__ = ("prop",)
+
     def __init__(self, prop):
         self.prop = prop
 
@@ -14,6 +24,25 @@ class Graph(object):
         self.__m = 0
         self.__matrix = [[NOT_CONNECTED for _ in range(n)] for _ in range(n)]
         self.__vertices = [Vertex(-1) for _ in range(n)]
+        self.__index = {vertex: i for i, vertex in enumerate(self.__vertices)}
+        self.__changes = []
+
+    @classmethod
+    def from_edges(cls, n, edges):
+        """
+        Method creates graph with n vertices from iterable of (index, index) pairs.
+        :param n:
+        :param edges:
+        :return: Graph
+        """
+        graph = cls(n)
+        matrix = graph.__matrix
+        for i, j in edges:
+            assert matrix[i][j] == NOT_CONNECTED, "Edge exists!"
+            matrix[i][j] = CONNECTED
+            matrix[j][i] = CONNECTED
+            graph.__m += 1
+        return graph
 
     def __str__(self):
         txt = "Graph with {} vertices\nAnd {} edges\n".format(self.__n, self.__m)
@@ -24,30 +53,78 @@ class Graph(object):
         return txt
 
     def get_subgraph(self, vertex_set):
-        subgraph = Graph(0)
-        for vertex in vertex_set:
-            subgraph.add_vertex(vertex)
-        for vertex in vertex_set:
-            for neigh in self.get_neighbours(vertex):
-                if neigh in vertex_set and not subgraph.is_connected(vertex, neigh):
-                    subgraph.add_edge(vertex, neigh)
-        return subgraph
+        """
+        Method returns induced subgraph as a view sharing this graph's matrix, see SubgraphView.
+        :param vertex_set:
+        :return: SubgraphView
+        """
+        return SubgraphView(self, vertex_set)
 
     def add_vertex(self, v):
         self.__n += 1
+        self.__index[v] = len(self.__vertices)
         self.__vertices.append(v)
         for row in self.__matrix:
             row.append(NOT_CONNECTED)
         self.__matrix.append([NOT_CONNECTED for _ in range(self.__n)])
+        self.__changes.append((ADD_VERTEX, v))
         return self.__n
 
+    def remove_vertex(self, v):
+        """
+        Method removes v with its edges, indices of vertices after v decrease by one.
+        Removal of every edge is logged before removal of the vertex.
+        :param v:
+        :return:
+        """
+        for neigh in self.get_neighbours(v):
+            self.remove_edge(v, neigh)
+        index = self.__index.pop(v)
+        self.__n -= 1
+        del self.__vertices[index]
+        del self.__matrix[index]
+        for row in self.__matrix:
+            del row[index]
+        for i in range(index, self.__n):
+            self.__index[self.__vertices[i]] = i
+        self.__changes.append((REMOVE_VERTEX, v, index))
+
     def add_edge(self, v1, v2):
-        index_v1 = self.__vertices.index(v1)
-        index_v2 = self.__vertices.index(v2)
+        index_v1 = self.__index[v1]
+        index_v2 = self.__index[v2]
         assert self.__matrix[index_v1][index_v2] == NOT_CONNECTED, "Edge exists!"
         self.__m += 1
         self.__matrix[index_v1][index_v2] = CONNECTED
         self.__matrix[index_v2][index_v1] = CONNECTED
+        self.__changes.append((ADD_EDGE, v1, v2))
+
+    def remove_edge(self, v1, v2):
+        index_v1 = self.__index[v1]
+        index_v2 = self.__index[v2]
+        assert self.__matrix[index_v1][index_v2] == CONNECTED, "Edge doesn't exist!"
+        self.__m -= 1
+        self.__matrix[index_v1][index_v2] = NOT_CONNECTED
+        self.__matrix[index_v2][index_v1] = NOT_CONNECTED
+        self.__changes.append((REMOVE_EDGE, v1, v2))
+
+    def get_version(self):
+        """
+        Method returns number of changes in change log, it identifies current state of the graph.
+        :return:
+        """
+        return len(self.__changes)
+
+    def get_changes(self, since=0):
+        """
+        Method returns changes made after given version, as (kind, vertex) or (kind, vertex, vertex) tuples,
+        removal of a vertex is (kind, vertex, its index before removal).
+        :param since: version returned by get_version
+        :return: list of changes
+        """
+        return self.__changes[since:]
+
+    def has_vertex(self, v):
+        return v in self.__index
 
     def get_vertices(self):
         return self.__vertices
@@ -60,25 +137,26 @@ class Graph(object):
         :param v2:
         :return:
         """
-        index_v1 = self.__vertices.index(v1)
-        index_v2 = self.__vertices.index(v2)
+        index_v1 = self.__index[v1]
+        index_v2 = self.__index[v2]
         return True if self.__matrix[index_v1][index_v2] == 1 else False
 
     def get_degree(self, v):
-        index = self.__vertices.index(v)
+        index = self.__index[v]
         degree = sum(self.__matrix[index])
         return degree
 
     def get_neighbours(self, v):
-        index = self.__vertices.index(v)
-        neighbours = [vertex for vertex in self.__vertices
-                      if self.__matrix[index][self.__vertices.index(vertex)] == CONNECTED]
+        row = self.__matrix[self.__index[v]]
+        neighbours = [vertex for vertex, cell in zip(self.__vertices, row) if cell == CONNECTED]
         return neighbours
 
+    def get_neighbour_indices(self, index):
+        return [i for i, cell in enumerate(self.__matrix[index]) if cell == CONNECTED]
+
     def get_not_neighbours(self, v):
-        index = self.__vertices.index(v)
-        not_neighbours = [vertex for vertex in self.__vertices
-                          if self.__matrix[index][self.__vertices.index(vertex)] == NOT_CONNECTED]
+        row = self.__matrix[self.__index[v]]
+        not_neighbours = [vertex for vertex, cell in zip(self.__vertices, row) if cell == NOT_CONNECTED]
         return not_neighbours
 
     def get_n(self):
@@ -88,18 +166,21 @@ class Graph(object):
         return self.__m
 
     def get_vertex_index(self, v):
-        return self.__vertices.index(v)
+        return self.__index[v]
+
+    def get_vertex(self, index):
+        return self.__vertices[index]
 
     def get_complement(self):
+        """
+        Method returns complement graph as a copy, ComplementView gives it without copying.
+        :return: Graph
+        """
         rev = Graph(0)
-        for vertex in self.__vertices:
-            rev.add_vertex(vertex)
-        rev.__m = self.__n * (self.__n - 1) / 2 - self.__m
-        for i in range(len(self.__matrix)):
-            for j in range(len(self.__matrix[i])):
-                if self.__matrix[i][j] == NOT_CONNECTED:
-                    rev.__matrix[i][j] = CONNECTED
-                else:
-                    rev.__matrix[i][j] = NOT_CONNECTED
+        rev.__vertices = list(self.__vertices)
+        rev.__index = dict(self.__index)
+        rev.__n = self.__n
+        rev.__m = self.__n * (self.__n - 1) // 2 - self.__m
+        rev.__matrix = [[NOT_CONNECTED if i == j or cell == CONNECTED else CONNECTED for j, cell in enumerate(row)]
+                        for i, row in enumerate(self.__matrix)]
         return rev
-
@@ -1,70 +1,129 @@
+import math
 import random
 from GraphLib.Graph import Graph
 
 
 class GraphGenerator(object):
+    """
+    Random graphs generators.
+    Edges are generated as pairs of vertices indices (smaller index first) and emitted
+    into graph_class with from_edges, so generation costs O(n + m) for sparse backends.
+    """
 
     @classmethod
-    def __generate_random_spanning_tree(cls, graph):
+    def __generate_random_spanning_tree(cls, n, edges, rng):
         """
         http://citeseerx.ist.psu.edu/viewdoc/download?doi=10.1.1.47.8598&rep=rep1&type=pdf
+        Random walk on complete graph, every vertex is connected with the vertex the walk entered it from.
+        Expected number of steps is O(n log n).
         :return:
         """
-        edges_before = graph.get_m()
-        vertices = graph.get_vertices()
-        to_discover, discovered = set(vertices), set()
-        current_vertex = random.sample(to_discover, 1).pop()
-        to_discover.remove(current_vertex)
-        discovered.add(current_vertex)
+        edges_before = len(edges)
+        if n == 0:
+            return
+        discovered = [False] * n
+        current_vertex = rng.randrange(n)
+        discovered[current_vertex] = True
+        to_discover = n - 1
         while to_discover:
-            neighbour_vertex = random.sample(vertices, 1).pop()
-            if neighbour_vertex not in discovered:
-                graph.add_edge(current_vertex, neighbour_vertex)
-                to_discover.remove(neighbour_vertex)
-                discovered.add(neighbour_vertex)
+            neighbour_vertex = rng.randrange(n)
+            if not discovered[neighbour_vertex]:
+                edges.add((min(current_vertex, neighbour_vertex), max(current_vertex, neighbour_vertex)))
+                discovered[neighbour_vertex] = True
+                to_discover -= 1
             current_vertex = neighbour_vertex
-        assert graph.get_m() - edges_before == len(vertices) - 1, "Method didn't add proper number of edges!"
+        assert len(edges) - edges_before == n - 1, "Method didn't add proper number of edges!"
 
     @classmethod
-    def __generate_edges(cls, graph, m):
-        edges_before = graph.get_m()
-        vertices = graph.get_vertices()
-        for _ in range(m):
-            v1 = random.choice(vertices)
-            v2 = random.choice(graph.get_not_neighbours(v1))
-            while v2 is v1:
-                v1 = random.choice(vertices)
-                v2 = random.choice(graph.get_not_neighbours(v1))
-            graph.add_edge(v1, v2)
-        assert graph.get_m() - edges_before == m, "Method didn't add proper number of edges!"
+    def __generate_edges(cls, n, edges, m, rng):
+        """
+        Method adds m new random edges. Sparse case uses hashed rejection sampling,
+        if more than a half of all pairs is needed, pairs left out are sampled instead.
+        :return:
+        """
+        edges_before = len(edges)
+        all_pairs = n * (n - 1) // 2
+        assert edges_before + m <= all_pairs, "Too many edges"
+        if 2 * (edges_before + m) <= all_pairs:
+            while len(edges) - edges_before < m:
+                v1, v2 = rng.randrange(n), rng.randrange(n)
+                if v1 != v2:
+                    edges.add((min(v1, v2), max(v1, v2)))
+        else:
+            excluded = set()
+            while len(excluded) < all_pairs - edges_before - m:
+                v1, v2 = rng.randrange(n), rng.randrange(n)
+                pair = (min(v1, v2), max(v1, v2))
+                if v1 != v2 and pair not in edges:
+                    excluded.add(pair)
+            for v1 in range(n):
+                for v2 in range(v1 + 1, n):
+                    if (v1, v2) not in excluded:
+                        edges.add((v1, v2))
+        assert len(edges) - edges_before == m, "Method didn't add proper number of edges!"
 
     @classmethod
-    def generate(cls, n, m=None, connected=True):
+    def generate(cls, n, m=None, connected=True, graph_class=Graph, seed=None):
+        """
+        G(n, m) random graph.
+        :param n: number of vertices
+        :param m: number of edges, random if None
+        :param connected: graph contains a random spanning tree
+        :param graph_class: graph backend
+        :param seed: seed of random numbers generator
+        :return: graph
+        """
+        rng = random.Random(seed)
         if m is None:
-            m = random.randint(n-1, n*(n-1)/2)
-        graph = Graph(n)
+            m = rng.randint(n-1, n*(n-1)//2)
+        edges = set()
         if connected:
-            cls.__generate_random_spanning_tree(graph)
-        else:
-            cls.__generate_edges(graph, n-1)
-        edges_remaining = m - (n - 1)
-        cls.__generate_edges(graph, edges_remaining)
-        return graph
+            assert m >= n - 1, "Connected graph needs at least n - 1 edges"
+            cls.__generate_random_spanning_tree(n, edges, rng)
+        cls.__generate_edges(n, edges, m - len(edges), rng)
+        return graph_class.from_edges(n, edges)
 
     @classmethod
-    def generate_triangularization(cls, size):
+    def generate_gnp(cls, n, p, connected=True, graph_class=Graph, seed=None):
+        """
+        G(n, p) random graph, every pair is connected with probability p.
+        Pairs are enumerated with geometric skips (Batagelj, Brandes), so it costs O(n + m).
+        :param n: number of vertices
+        :param p: edge probability
+        :param connected: random spanning tree is added to sampled edges
+        :param graph_class: graph backend
+        :param seed: seed of random numbers generator
+        :return: graph
+        """
+        assert 0 <= p <= 1, "Probability must be in [0, 1]"
+        rng = random.Random(seed)
+        edges = set()
+        if connected:
+            cls.__generate_random_spanning_tree(n, edges, rng)
+        if p == 1:
+            edges.update((v1, v2) for v2 in range(n) for v1 in range(v2))
+        elif p > 0:
+            log_q = math.log(1 - p)
+            v1, v2 = -1, 1
+            while v2 < n:
+                v1 += 1 + int(math.log(1 - rng.random()) / log_q)
+                while v1 >= v2 and v2 < n:
+                    v1 -= v2
+                    v2 += 1
+                if v2 < n:
+                    edges.add((v1, v2))
+        return graph_class.from_edges(n, edges)
+
+    @classmethod
+    def generate_triangularization(cls, size, graph_class=Graph):
         n = size ** 2
-        graph = Graph(n)
-        vertices = graph.get_vertices()
+        edges = []
         for row in range(size):
             for i in range(size):
                 if row != 0:
-                    graph.add_edge(vertices[row * size + i], vertices[row * size + i-size])
+                    edges.append((row * size + i, row * size + i-size))
                 if i != size - 1:
-                    graph.add_edge(vertices[row * size + i], vertices[row * size + i+1])
+                    edges.append((row * size + i, row * size + i+1))
                 if row != 0 and i != size - 1:
-                    graph.add_edge(vertices[row * size + i], vertices[row * size + i-size+1])
-        return graph
-
-
-
+                    edges.append((row * size + i, row * size + i-size+1))
+        return graph_class.from_edges(n, edges)
@@ -0,0 +1,197 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from GraphLib.SparseGraph import SparseGraph
+
+BINARY_MAGIC = b"GBSRCSR1"
+# magic, number of vertices, number of neighbours entries, neighbours item size, little endian flag
+BINARY_HEADER = struct.Struct("<8sqqqq")
+BINARY_EXTENSION = ".bgr"
+METIS_EXTENSIONS = (".graph", ".metis")
+
+
+class GraphIO(object):
+    """
+    Reading graphs from files into SparseGraph.
+    Text formats are parsed line by line straight into CSR arrays, edges are never kept as Python tuples.
+    Binary format is the CSR arrays themselves:
+    header, n + 1 int64 offsets, neighbours as int32 (or int64 for huge graphs).
+    Binary files are memory-mapped, so loading them doesn't parse or copy anything.
+    """
+
+    @classmethod
+    def __rows_to_graph(cls, n, sources, targets):
+        """
+        Method builds symmetric CSR from arrays of edges endpoints by counting sort.
+        Self-loops and repeated edges are dropped.
+        :return: SparseGraph
+        """
+        counts = array('q', [0]) * (n + 1)
+        for v in sources:
+            counts[v + 1] += 1
+        for v in targets:
+            counts[v + 1] += 1
+        for i in range(n):
+            counts[i + 1] += counts[i]
+        fill = array('q', counts)
+        entries = array('q', [0]) * counts[n]
+        for v1, v2 in zip(sources, targets):
+            entries[fill[v1]] = v2
+            fill[v1] += 1
+            entries[fill[v2]] = v1
+            fill[v2] += 1
+        offsets = array('q', [0])
+        neighbours = array('q')
+        for i in range(n):
+            previous = -1
+            for nb in sorted(entries[counts[i]:counts[i + 1]]):
+                if nb != previous and nb != i:
+                    neighbours.append(nb)
+                previous = nb
+            offsets.append(len(neighbours))
+        return SparseGraph.from_csr(offsets, neighbours)
+
+    @classmethod
+    def read_edge_list(cls, path):
+        """
+        Method reads whitespace separated pairs of 0-based vertices indices, one edge per line.
+        Lines starting with # or % are comments, other columns are ignored.
+        Edges may be listed in one or both directions.
+        :param path:
+        :return: SparseGraph
+        """
+        sources, targets = array('q'), array('q')
+        n = 0
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.strip() or line[0] in b"#%":
+                    continue
+                fields = line.split(None, 2)
+                v1, v2 = int(fields[0]), int(fields[1])
+                sources.append(v1)
+                targets.append(v2)
+                n = max(n, v1 + 1, v2 + 1)
+        return cls.__rows_to_graph(n, sources, targets)
+
+    @staticmethod
+    def __parse_metis_header(line):
+        """
+        :return: n, m, number of fields before neighbours in vertex line, step between neighbours
+        """
+        header = line.split()
+        n, m = int(header[0]), int(header[1])
+        fmt = header[2].decode().zfill(3) if len(header) > 2 else "000"
+        ncon = int(header[3]) if len(header) > 3 else 1
+        vertex_fields = (1 if fmt[0] == "1" else 0) + (ncon if fmt[1] == "1" else 0)
+        step = 2 if fmt[2] == "1" else 1
+        return n, m, vertex_fields, step
+
+    @classmethod
+    def read_metis_header(cls, path):
+        """
+        :param path:
+        :return: number of vertices and number of edges of METIS graph
+        """
+        with open(path, "rb") as f:
+            n, m, _, _ = cls.__parse_metis_header(next(line for line in f if not line.startswith(b"%")))
+        return n, m
+
+    @classmethod
+    def stream_metis(cls, path):
+        """
+        Generator of (vertex index, neighbours indices) pairs of METIS graph read one line at a time,
+        so memory doesn't depend on size of the file. Vertex sizes and weights are skipped.
+        :param path:
+        :return:
+        """
+        with open(path, "rb") as f:
+            lines = (line for line in f if not line.startswith(b"%"))
+            n, _, vertex_fields, step = cls.__parse_metis_header(next(lines))
+            for v in range(n):
+                line = next(lines, None)
+                assert line is not None, "File has fewer vertex lines than header says"
+                fields = line.split()[vertex_fields:]
+                yield v, [int(nb) - 1 for nb in fields[::step]]
+
+    @classmethod
+    def read_metis(cls, path):
+        """
+        Method reads METIS graph format: header "n m [fmt [ncon]]" and one line of 1-based neighbours per vertex.
+        Vertex sizes, vertex weights and edge weights are skipped.
+        :param path:
+        :return: SparseGraph
+        """
+        _, m = cls.read_metis_header(path)
+        offsets = array('q', [0])
+        neighbours = array('q')
+        for _, row in cls.stream_metis(path):
+            neighbours.extend(sorted(row))
+            offsets.append(len(neighbours))
+        assert len(neighbours) == 2 * m, "Number of edges doesn't match header"
+        return SparseGraph.from_csr(offsets, neighbours)
+
+    @classmethod
+    def write_binary(cls, graph, path):
+        """
+        Method writes graph in binary CSR format.
+        :param graph: graph of any backend
+        :param path:
+        :return:
+        """
+        n = graph.get_n()
+        offsets = array('q', [0])
+        for i in range(n):
+            offsets.append(offsets[-1] + len(graph.get_neighbour_indices(i)))
+        typecode = 'i' if n < 2 ** 31 else 'q'
+        with open(path, "wb") as f:
+            f.write(BINARY_HEADER.pack(BINARY_MAGIC, n, offsets[n], array(typecode).itemsize,
+                                       sys.byteorder == "little"))
+            offsets.tofile(f)
+            for i in range(n):
+                array(typecode, sorted(graph.get_neighbour_indices(i))).tofile(f)
+
+    @classmethod
+    def load_binary(cls, path):
+        """
+        Method memory-maps binary CSR file, arrays of the graph are views of the mapped file.
+        :param path:
+        :return: SparseGraph
+        """
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n, entries, itemsize, little_endian = BINARY_HEADER.unpack_from(mapped)
+        assert magic == BINARY_MAGIC, "Not a binary graph file"
+        assert little_endian == (sys.byteorder == "little"), "Binary graph file has different byte order"
+        view = memoryview(mapped)
+        start = BINARY_HEADER.size
+        end = start + 8 * (n + 1)
+        offsets = view[start:end].cast('q')
+        neighbours = view[end:end + itemsize * entries].cast('i' if itemsize == 4 else 'q')
+        return SparseGraph.from_csr(offsets, neighbours)
+
+    @classmethod
+    def load(cls, path, cache=True):
+        """
+        Method loads graph choosing format by file extension: METIS for .graph and .metis,
+        binary for .bgr, edge list otherwise.
+        Parsed text files are cached next to the source as path + .bgr and the cache is used
+        as long as it is newer than the source.
+        :param path:
+        :param cache: use and create binary cache
+        :return: SparseGraph
+        """
+        if path.endswith(BINARY_EXTENSION):
+            return cls.load_binary(path)
+        cache_path = path + BINARY_EXTENSION
+        if cache and os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(path):
+            return cls.load_binary(cache_path)
+        if path.endswith(METIS_EXTENSIONS):
+            graph = cls.read_metis(path)
+        else:
+            graph = cls.read_edge_list(path)
+        if not cache:
+            return graph
+        cls.write_binary(graph, cache_path)
+        return cls.load_binary(cache_path)
@@ -0,0 +1,259 @@
+from array import array
+from bisect import bisect_left
+from GraphLib.SubgraphView import SubgraphView
+from GraphLib.Graph import Vertex, ADD_VERTEX, REMOVE_VERTEX, ADD_EDGE, REMOVE_EDGE
+
+
+class SparseGraph(object):
+    """
+    Graph stored in compressed sparse row (CSR) format.
+    Neighbours of vertex with index i are neighbours[offsets[i]:offsets[i + 1]], every row is sorted.
+    Edges added after construction are kept in a per vertex buffer and merged into CSR arrays
+    when the buffer grows as big as the arrays, so add_edge stays amortized O(1).
+    Removed edges are kept in a per vertex set of deleted neighbours until the next merge, the same way.
+    Public API is the same as Graph's.
+    """
+
+    def __init__(self, n):
+        self.__n = n
+        self.__m = 0
+        self.__vertices = [Vertex(-1) for _ in range(n)]
+        self.__index = {vertex: i for i, vertex in enumerate(self.__vertices)}
+        self.__offsets = array('q', [0] * (n + 1))
+        self.__neighbours = array('q')
+        self.__pending = {}
+        self.__removed = {}
+        self.__pending_m = 0
+        self.__changes = []
+
+    @classmethod
+    def from_csr(cls, offsets, neighbours, vertices=None):
+        """
+        Method creates graph directly from CSR arrays.
+        Every edge has to be stored in both directions and every row has to be sorted.
+        :param offsets: sequence of n + 1 row offsets
+        :param neighbours: sequence of neighbours indices
+        :param vertices: optional list of n Vertex objects, new vertices are created if None
+        :return: SparseGraph
+        """
+        n = len(offsets) - 1
+        assert len(neighbours) == offsets[n], "Offsets don't match neighbours array"
+        assert len(neighbours) % 2 == 0, "Each edge should be stored twice"
+        graph = cls(0)
+        graph.__n = n
+        graph.__m = len(neighbours) // 2
+        graph.__vertices = list(vertices) if vertices is not None else [Vertex(-1) for _ in range(n)]
+        assert len(graph.__vertices) == n, "Wrong number of vertices"
+        graph.__index = {vertex: i for i, vertex in enumerate(graph.__vertices)}
+        graph.__offsets = offsets
+        graph.__neighbours = neighbours
+        graph.__changes = []
+        return graph
+
+    @classmethod
+    def from_edges(cls, n, edges):
+        """
+        Method creates graph with n vertices from iterable of (index, index) pairs.
+        :param n:
+        :param edges:
+        :return: SparseGraph
+        """
+        rows = [[] for _ in range(n)]
+        for i, j in edges:
+            rows[i].append(j)
+            rows[j].append(i)
+        offsets, neighbours = cls.__rows_to_csr(rows)
+        for i in range(n):
+            start, end = offsets[i], offsets[i + 1]
+            for k in range(start + 1, end):
+                assert neighbours[k - 1] != neighbours[k], "Edge exists!"
+        return cls.from_csr(offsets, neighbours)
+
+    @staticmethod
+    def __rows_to_csr(rows):
+        offsets = array('q', [0])
+        neighbours = array('q')
+        for row in rows:
+            neighbours.extend(sorted(row))
+            offsets.append(len(neighbours))
+        return offsets, neighbours
+
+    def __str__(self):
+        txt = "Graph with {} vertices\nAnd {} edges\n".format(self.__n, self.__m)
+        for i in range(self.__n):
+            txt += "{}: {}\n".format(i, " ".join(str(j) for j in self.get_neighbour_indices(i)))
+        return txt
+
+    def __compact(self, skip=None):
+        """
+        Method merges buffered edges and removals into CSR arrays.
+        :param skip: index of vertex without edges which is dropped from arrays, None keeps all vertices
+        :return:
+        """
+        rows = [self.get_neighbour_indices(i) for i in range(self.__n)]
+        if skip is not None:
+            del rows[skip]
+            rows = [[j - 1 if j > skip else j for j in row] for row in rows]
+        self.__offsets, self.__neighbours = self.__rows_to_csr(rows)
+        self.__pending = {}
+        self.__removed = {}
+        self.__pending_m = 0
+
+    def __buffer_change(self):
+        self.__pending_m += 1
+        if 2 * self.__pending_m > max(len(self.__neighbours), self.__n):
+            self.__compact()
+
+    def __row(self, index):
+        return self.__offsets[index], self.__offsets[index + 1]
+
+    def get_subgraph(self, vertex_set):
+        """
+        Method returns induced subgraph as a view sharing this graph's arrays, see SubgraphView.
+        :param vertex_set:
+        :return: SubgraphView
+        """
+        return SubgraphView(self, vertex_set)
+
+    def add_vertex(self, v):
+        self.__n += 1
+        self.__index[v] = len(self.__vertices)
+        self.__vertices.append(v)
+        if not isinstance(self.__offsets, array):
+            self.__offsets = array('q', self.__offsets)
+        self.__offsets.append(self.__offsets[-1])
+        self.__changes.append((ADD_VERTEX, v))
+        return self.__n
+
+    def remove_vertex(self, v):
+        """
+        Method removes v with its edges, indices of vertices after v decrease by one.
+        Removal of every edge is logged before removal of the vertex.
+        Arrays are rebuilt, so it costs O(n + m).
+        :param v:
+        :return:
+        """
+        for neigh in self.get_neighbours(v):
+            self.remove_edge(v, neigh)
+        index = self.__index.pop(v)
+        self.__compact(skip=index)
+        self.__n -= 1
+        del self.__vertices[index]
+        for i in range(index, self.__n):
+            self.__index[self.__vertices[i]] = i
+        self.__changes.append((REMOVE_VERTEX, v, index))
+
+    def add_edge(self, v1, v2):
+        index_v1 = self.__index[v1]
+        index_v2 = self.__index[v2]
+        assert not self.__is_connected(index_v1, index_v2), "Edge exists!"
+        self.__m += 1
+        self.__pending.setdefault(index_v1, set()).add(index_v2)
+        self.__pending.setdefault(index_v2, set()).add(index_v1)
+        self.__changes.append((ADD_EDGE, v1, v2))
+        self.__buffer_change()
+
+    def remove_edge(self, v1, v2):
+        index_v1 = self.__index[v1]
+        index_v2 = self.__index[v2]
+        assert self.__is_connected(index_v1, index_v2), "Edge doesn't exist!"
+        self.__m -= 1
+        for i, j in ((index_v1, index_v2), (index_v2, index_v1)):
+            pending = self.__pending.get(i)
+            if pending is not None and j in pending:
+                pending.discard(j)
+            else:
+                self.__removed.setdefault(i, set()).add(j)
+        self.__changes.append((REMOVE_EDGE, v1, v2))
+        self.__buffer_change()
+
+    def get_version(self):
+        """
+        Method returns number of changes in change log, it identifies current state of the graph.
+        :return:
+        """
+        return len(self.__changes)
+
+    def get_changes(self, since=0):
+        """
+        Method returns changes made after given version, as (kind, vertex) or (kind, vertex, vertex) tuples,
+        removal of a vertex is (kind, vertex, its index before removal).
+        :param since: version returned by get_version
+        :return: list of changes
+        """
+        return self.__changes[since:]
+
+    def has_vertex(self, v):
+        return v in self.__index
+
+    def get_vertices(self):
+        return self.__vertices
+
+    def __is_connected(self, index_v1, index_v2):
+        pending = self.__pending.get(index_v1)
+        if pending is not None and index_v2 in pending:
+            return True
+        removed = self.__removed.get(index_v1)
+        if removed is not None and index_v2 in removed:
+            return False
+        start, end = self.__row(index_v1)
+        k = bisect_left(self.__neighbours, index_v2, start, end)
+        return k < end and self.__neighbours[k] == index_v2
+
+    def is_connected(self, v1, v2):
+        """
+        Method checks if there is an edge connecting v1 and v2.
+        Returns false if v1 and v2 are the same vertex.
+        :param v1:
+        :param v2:
+        :return:
+        """
+        return self.__is_connected(self.__index[v1], self.__index[v2])
+
+    def get_degree(self, v):
+        index = self.__index[v]
+        start, end = self.__row(index)
+        return end - start + len(self.__pending.get(index, ())) - len(self.__removed.get(index, ()))
+
+    def get_neighbour_indices(self, index):
+        start, end = self.__row(index)
+        removed = self.__removed.get(index)
+        if removed:
+            neighbours = [j for j in self.__neighbours[start:end] if j not in removed]
+        else:
+            neighbours = list(self.__neighbours[start:end])
+        pending = self.__pending.get(index)
+        if pending:
+            neighbours.extend(pending)
+        return neighbours
+
+    def get_neighbours(self, v):
+        return [self.__vertices[i] for i in self.get_neighbour_indices(self.__index[v])]
+
+    def get_not_neighbours(self, v):
+        neighbours = set(self.get_neighbour_indices(self.__index[v]))
+        return [vertex for i, vertex in enumerate(self.__vertices) if i not in neighbours]
+
+    def get_n(self):
+        return self.__n
+
+    def get_m(self):
+        return self.__m
+
+    def get_vertex_index(self, v):
+        return self.__index[v]
+
+    def get_vertex(self, index):
+        return self.__vertices[index]
+
+    def get_complement(self):
+        """
+        Method returns complement graph as a copy, ComplementView gives it without copying.
+        :return: SparseGraph
+        """
+        rows = []
+        for i in range(self.__n):
+            neighbours = set(self.get_neighbour_indices(i))
+            rows.append([j for j in range(self.__n) if j != i and j not in neighbours])
+        offsets, neighbours = self.__rows_to_csr(rows)
+        return SparseGraph.from_csr(offsets, neighbours, self.__vertices)
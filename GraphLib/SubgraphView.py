@@ -0,0 +1,94 @@
+class SubgraphView(object):
+    """
+    Read-only induced subgraph sharing adjacency storage of its parent graph.
+    Only the list of vertices and remapping of parent indices to view indices are stored, so creating a view
+    costs O(k) for k vertices. Neighbours are read from the parent and filtered on every call.
+    Subgraphs of a view are views of the same parent, so views never chain.
+    The view reflects the parent as it is, it shouldn't be used after vertices of the parent were removed.
+    Public API is the same as Graph's without modifying methods.
+    """
+
+    def __init__(self, graph, vertex_set):
+        """
+        :param graph: parent graph of any backend
+        :param vertex_set: iterable of parent's vertices, their order defines indices in the view
+        """
+        self.__graph = graph
+        self.__vertices = list(vertex_set)
+        self.__index = {vertex: i for i, vertex in enumerate(self.__vertices)}
+        self.__remap = {graph.get_vertex_index(vertex): i for i, vertex in enumerate(self.__vertices)}
+        assert len(self.__remap) == len(self.__vertices), "Repeated vertices"
+        self.__m = None
+
+    def __str__(self):
+        txt = "Graph with {} vertices\nAnd {} edges\n".format(self.get_n(), self.get_m())
+        for i in range(self.get_n()):
+            txt += "{}: {}\n".format(i, " ".join(str(j) for j in self.get_neighbour_indices(i)))
+        return txt
+
+    def get_parent(self):
+        return self.__graph
+
+    def get_subgraph(self, vertex_set):
+        assert all(vertex in self.__index for vertex in vertex_set), "Vertex outside of the view"
+        return SubgraphView(self.__graph, vertex_set)
+
+    def get_version(self):
+        """
+        Views can't be modified, so their change log is always empty.
+        :return:
+        """
+        return 0
+
+    def get_changes(self, since=0):
+        return []
+
+    def has_vertex(self, v):
+        return v in self.__index
+
+    def get_vertices(self):
+        return self.__vertices
+
+    def is_connected(self, v1, v2):
+        """
+        Method checks if there is an edge connecting v1 and v2.
+        Returns false if v1 and v2 are the same vertex.
+        :param v1:
+        :param v2:
+        :return:
+        """
+        assert v1 in self.__index and v2 in self.__index, "Vertex outside of the view"
+        return self.__graph.is_connected(v1, v2)
+
+    def get_degree(self, v):
+        return len(self.get_neighbour_indices(self.__index[v]))
+
+    def get_neighbour_indices(self, index):
+        remap = self.__remap
+        parent_index = self.__graph.get_vertex_index(self.__vertices[index])
+        return [remap[j] for j in self.__graph.get_neighbour_indices(parent_index) if j in remap]
+
+    def get_neighbours(self, v):
+        return [self.__vertices[i] for i in self.get_neighbour_indices(self.__index[v])]
+
+    def get_not_neighbours(self, v):
+        neighbours = set(self.get_neighbour_indices(self.__index[v]))
+        return [vertex for i, vertex in enumerate(self.__vertices) if i not in neighbours]
+
+    def get_n(self):
+        return len(self.__vertices)
+
+    def get_m(self):
+        """
+        Number of edges is counted on the first call, O(sum of degrees of view vertices).
+        :return:
+        """
+        if self.__m is None:
+            self.__m = sum(len(self.get_neighbour_indices(i)) for i in range(len(self.__vertices))) // 2
+        return self.__m
+
+    def get_vertex_index(self, v):
+        return self.__index[v]
+
+    def get_vertex(self, index):
+        return self.__vertices[index]
@@ -1,34 +1,170 @@
 import random
 import math
+import collections
+import multiprocessing
+import os
+from PartitioningLib.KernighanLin import KernighanLin
+from PartitioningLib.FiducciaMattheyses import FiducciaMattheyses
+from PartitioningLib.Multilevel import Multilevel, DEFAULT_COARSEST_N
+from PartitioningLib.NumpyKernels import NumpyKernels, NUMPY_AVAILABLE
+from PartitioningLib.KWay import RecursiveBisection, KWayRefinement
+from PartitioningLib.Spectral import Spectral
+from PartitioningLib.Streaming import Streaming
+from PartitioningLib.BranchAndBound import BranchAndBound
+from PartitioningLib.PartitionCache import PartitionCache
+from PartitioningLib.Budget import Budget
+from PartitioningLib.PartitionState import PartitionState, PartitionSet, UNASSIGNED
+from PartitioningLib.Instrumentation import SXY_EVALUATIONS, SWAPS, MOVES, CALC_COST_CALLS, NEIGHBOUR_SCANS
+from GraphLib.Graph import ADD_VERTEX, REMOVE_VERTEX
+from GraphLib.BitsetGraph import BitsetGraph
+
+# methods which can be called by Partitioning.run
+METHODS = ("sga", "kla", "fm", "multilevel", "spectral", "streaming", "recursive_bisection", "kway_refine",
+           "update", "rbha", "bfs_partitions", "lpa", "ikla", "exact")
+
+# seconds the parent of ikla worker processes waits for a result before it checks its budget
+IKLA_POLL_INTERVAL = 0.05
+
+# graph and cancel event shared with ikla worker processes, each worker receives them once when it starts
+_worker_graph = None
+_worker_cancelled = None
+
+
+def _init_ikla_worker(graph, cancelled=None):
+    global _worker_graph, _worker_cancelled
+    _worker_graph = graph
+    _worker_cancelled = cancelled
+
+
+def _kla_restart(graph, sizes, vectorized, seed, instrumentation=None, budget=None):
+    bis = Partitioning(graph, sizes, vectorized, seed, instrumentation, budget)
+    bis.kla()
+    return bis.calc_cost(), bis.get_labels()
+
+
+def _ikla_worker_restart(task):
+    """
+    Method runs one kla restart in a worker process. With a budget the restart gets the parent's
+    deadline, remaining evaluations and the shared cancel event, which the parent sets when its budget runs out.
+    :param task: (sizes, vectorized, seed, limited, evaluations, deadline)
+    :return: cost, labels, evaluations spent
+    """
+    sizes, vectorized, seed, limited, evaluations, deadline = task
+    budget = Budget(evaluations=evaluations, deadline=deadline, cancelled=_worker_cancelled) if limited else None
+    cost, labels = _kla_restart(_worker_graph, sizes, vectorized, seed, budget=budget)
+    spent = evaluations - budget.get_remaining_evaluations() if evaluations is not None else 0
+    return cost, labels, spent
 
 
 class Partitioning(object):
 
-    def __init__(self, graph, sizes=None):
+    def __init__(self, graph, sizes=None, vectorized=False, seed=None, instrumentation=None, budget=None,
+                 cache=None):
+        """
+        :param graph:
+        :param sizes: partitions sizes in percents
+        :param vectorized: use NumPy kernels for cost and S(x, y) computations
+        :param seed: seed of random numbers generator, results are reproducible for equal seeds
+        :param instrumentation: Instrumentation collecting counters, passes and runs, None disables it
+        :param budget: Budget limiting time or evaluations of algorithms, when it is exhausted algorithms stop
+        and keep the best partitions found so far, unlimited if None
+        :param cache: PartitionCache used by run, None disables caching
+        """
         if sizes is None:
             sizes = [50, 50]
         assert len(sizes) >= 2, "Number of partitions must be greater or equal 2"
         assert sum(sizes) == 100, "Partitions sizes don't sum to 100"
+        assert not vectorized or NUMPY_AVAILABLE, "NumPy is required for vectorized mode"
         self.__graph = graph
         self.__sizes = sizes
         self.__n = len(sizes)
+        self.__vectorized = vectorized
+        self.__rng = random.Random(seed)
+        self.__instrumentation = instrumentation
+        self.__budget = budget
+        self.__seed = seed
+        self.__cache = cache
+        # graph version and fingerprint of the graph, computed when cache is used for the first time
+        self.__fingerprint = None
+        # graph version and NumpyKernels of the graph, built when vectorized cut is computed for the first time
+        self.__kernels = None
+        # allowed difference between partition size and its size from sizes, checked by calc_cost
+        self.__tolerance = 1
+        self.__state = PartitionState(graph.get_n(), self.__n)
+        # live read-only sets of vertices of every partition
+        self.__partitions = [PartitionSet(self.__state, part, graph) for part in range(self.__n)]
         self.__clear_partitions()
 
     def __str__(self):
         txt = ""
-        for partition in self.__partitions:
-            txt += "Partition {}: ".format(self.__partitions.index(partition))
-            for vertex in partition:
-                txt += "{} ".format(self.__graph.get_vertex_index(vertex))
+        for part in range(self.__n):
+            txt += "Partition {}: ".format(part)
+            for index in self.__state.members(part):
+                txt += "{} ".format(index)
             txt += "\n"
         cost = self.calc_cost()
         txt += "Cost: {}\n".format(cost)
         return txt
 
     def __clear_partitions(self):
-        self.__partitions = []
-        for _ in range(self.__n):
-            self.__partitions.append(set())
+        self.__state.clear(self.__graph.get_n())
+        # partitions are rebuilt for the current graph, update() applies only changes made after it
+        self.__graph_version = self.__graph.get_version()
+
+    def __start_run(self, method):
+        if self.__instrumentation is not None:
+            self.__instrumentation.start_run(method, self.__graph.get_n(), self.__graph.get_m())
+
+    def __end_run(self):
+        if self.__instrumentation is not None:
+            self.__instrumentation.end_run(self.__calc_cut())
+
+    def __is_exhausted(self):
+        return self.__budget is not None and self.__budget.is_exhausted()
+
+    def __record_pass(self):
+        if self.__instrumentation is not None:
+            self.__instrumentation.record_pass(self.__calc_cut())
+
+    def __get_adjacency(self):
+        """
+        Method builds adjacency lists of vertices indices.
+        :return: List of neighbours indices for every vertex index
+        """
+        if self.__instrumentation is not None:
+            self.__instrumentation.count(NEIGHBOUR_SCANS, self.__graph.get_n())
+        return [self.__graph.get_neighbour_indices(i) for i in range(self.__graph.get_n())]
+
+    def __get_labels(self):
+        """
+        Method converts partitions to list of partition numbers indexed by vertex index.
+        :return: List of labels
+        """
+        return self.__state.get_labels()
+
+    def get_labels(self):
+        """
+        Method returns partition number of every vertex, indexed by vertex index.
+        :return: List of labels, None for vertices not assigned yet
+        """
+        return self.__get_labels()
+
+    def get_partitions(self):
+        """
+        Method returns partitions as sets of vertices. Sets are read-only views of partitions,
+        they follow changes made by algorithms and set operators on them return plain sets.
+        :return: List of PartitionSet
+        """
+        return list(self.__partitions)
+
+    def __set_labels(self, labels):
+        """
+        Method rebuilds partitions from list of partition numbers indexed by vertex index.
+        :param labels:
+        :return:
+        """
+        self.__clear_partitions()
+        self.__state.set_labels(labels)
 
     def __get_vertices_numbers(self):
         """
@@ -40,25 +176,81 @@ class Partitioning(object):
         v_sizes[-1] = vertices - sum(v_sizes[:-1])
         return v_sizes
 
+    def __get_tolerance(self, imbalance):
+        """
+        Method converts allowed imbalance to number of vertices, at least one vertex so single moves are possible,
+        but less than the smallest non-empty partition size, so no partition can become empty on tiny graphs.
+        Tolerance is remembered for calc_cost checks.
+        :param imbalance: allowed deviation from sizes in percents of all vertices
+        :return: tolerance in vertices
+        """
+        tolerance = max(1, round(imbalance / 100 * self.__graph.get_n()))
+        smallest = min((v_size for v_size in self.__get_vertices_numbers() if v_size > 0), default=1)
+        self.__tolerance = min(tolerance, smallest - 1)
+        return self.__tolerance
+
     def calc_cost(self):
         """
         Method calculates number of edges between partitions.
         :return:
         """
-        # cost is number of edges inside partitions
+        if self.__instrumentation is not None:
+            self.__instrumentation.count(CALC_COST_CALLS)
+        for partition, v_size in zip(self.__partitions, self.__get_vertices_numbers()):
+            assert len(partition) >= v_size - self.__tolerance, "Partition too small"
+            assert v_size + self.__tolerance >= len(partition), "Partition too big"
+        return self.__calc_cut()
+
+    def __calc_cut(self):
+        """
+        Method calculates number of edges between partitions, unassigned vertices are skipped.
+        :return:
+        """
+        if isinstance(self.__graph, BitsetGraph):
+            return self.__calc_cut_bitset()
+        if self.__vectorized and sum(self.__state.get_sizes()) == self.__graph.get_n():
+            return self.__get_kernels().cut(self.__state.get_array())
+        labels = self.__get_labels()
         cost = 0
-        for partition in self.__partitions:
-            assert len(partition) >= self.__graph.get_n() / 2 - 1, "Partition too small"
-            assert self.__graph.get_n() / 2 + 1 >= len(partition), "Partition too big"
-            for v1 in partition:
-                for v2 in partition:
-                    if self.__graph.is_connected(v1, v2):
-                        cost += 1
+        for index, label in enumerate(labels):
+            if label is None:
+                continue
+            for nb in self.__graph.get_neighbour_indices(index):
+                if labels[nb] is not None and labels[nb] != label:
+                    cost += 1
         # dividing cost by 2 as we counted each edge twice
         assert cost % 2 == 0, "Cost should be an even number!"
-        cost /= 2
-        # return number of edges between partitions
-        return self.__graph.get_m() - cost
+        return cost // 2
+
+    def __get_kernels(self):
+        """
+        Method returns NumpyKernels of the graph, edge arrays are rebuilt only after the graph changes.
+        :return: NumpyKernels
+        """
+        version = self.__graph.get_version()
+        if self.__kernels is None or self.__kernels[0] != version:
+            self.__kernels = (version, NumpyKernels(self.__get_adjacency()))
+        return self.__kernels[1]
+
+    def __calc_cut_bitset(self):
+        """
+        Method calculates cut of BitsetGraph as popcounts of rows ANDed with masks of other partitions.
+        :return:
+        """
+        masks = [0] * self.__n
+        for part in range(self.__n):
+            for index in self.__state.members(part):
+                masks[part] |= 1 << index
+        assigned = 0
+        for mask in masks:
+            assigned |= mask
+        cost = 0
+        for part, mask in enumerate(masks):
+            outside = assigned ^ mask
+            for index in self.__state.members(part):
+                cost += (self.__graph.get_row(index) & outside).bit_count()
+        assert cost % 2 == 0, "Cost should be an even number!"
+        return cost // 2
 
     def __swap_vertices(self, v1, v2, p1, p2):
         """
@@ -70,72 +262,141 @@ class Partitioning(object):
         :return:
         """
         assert v1 in p1 and v2 in p2, "Vertices not inside correct partitions"
-        p1.remove(v1)
-        p2.remove(v2)
-        p1.add(v2)
-        p2.add(v1)
+        if self.__instrumentation is not None:
+            self.__instrumentation.count(SWAPS)
+        self.__state.assign(self.__graph.get_vertex_index(v1), p2.get_part())
+        self.__state.assign(self.__graph.get_vertex_index(v2), p1.get_part())
 
     def random_partitions(self):
         self.__clear_partitions()
         v_sizes = self.__get_vertices_numbers()
-        vertices = set(self.__graph.get_vertices())
+        indices = list(range(self.__graph.get_n()))
+        self.__rng.shuffle(indices)
+        start = 0
         for part_index in range(self.__n):
-            for _ in range(v_sizes[part_index]):
-                vertex = random.sample(vertices, 1).pop()
-                self.__partitions[part_index].add(vertex)
-                vertices.remove(vertex)
+            for index in indices[start:start + v_sizes[part_index]]:
+                self.__state.assign(index, part_index)
+            start += v_sizes[part_index]
 
-    def __get_vertex_cost(self, vertex, partition):
+    def __get_vertex_cost(self, vertex, partition, mask=None):
         """
         Method calculates number of edges connecting vertex with partition's vertices.
         If vertex in partition returns inner cost, else outer cost.
         :param vertex:
         :param partition:
+        :param mask: BitsetGraph mask of partition, cost is its popcount with vertex's row if given
         :return:
         """
         assert len(partition) > 0, "Partition is empty"
+        if self.__instrumentation is not None:
+            self.__instrumentation.count(NEIGHBOUR_SCANS)
+        if mask is not None:
+            return self.__graph.count_neighbours(vertex, mask)
+        if isinstance(partition, PartitionSet) and partition.get_state() is self.__state:
+            neighbours = self.__graph.get_neighbour_indices(self.__graph.get_vertex_index(vertex))
+            return self.__state.count(neighbours, partition.get_part())
         cost = 0
         for nb in self.__graph.get_neighbours(vertex):
             if nb in partition:
                 cost += 1
         return cost
 
-    def __calculate_sxy(self, v1, v2, p1, p2):
+    def __calculate_sxy(self, v1, v2, p1, p2, masks=(None, None)):
         """
         Method calculates S(x, y) defined in http://snovit.math.umu.se/~gerold/publ/bisection.pdf
         :param v1:
         :param v2:
         :param p1:
         :param p2:
+        :param masks: BitsetGraph masks of p1 and p2, neighbours are counted by popcounts if given
         :return:
         """
         assert (v1 in p1) and (v2 in p2), "Vertices not inside correct partitions"
+        if self.__instrumentation is not None:
+            self.__instrumentation.count(SXY_EVALUATIONS)
         # outer costs
-        ov1 = self.__get_vertex_cost(v1, p2)
-        ov2 = self.__get_vertex_cost(v2, p1)
+        ov1 = self.__get_vertex_cost(v1, p2, masks[1])
+        ov2 = self.__get_vertex_cost(v2, p1, masks[0])
         # inner costs
-        iv1 = self.__get_vertex_cost(v1, p1)
-        iv2 = self.__get_vertex_cost(v2, p2)
+        iv1 = self.__get_vertex_cost(v1, p1, masks[0])
+        iv2 = self.__get_vertex_cost(v2, p2, masks[1])
         # omega = is connected
         omega = 1 if self.__graph.is_connected(v1, v2) else 0
         sxy = ov1 - iv1 + ov2 - iv2 - 2*omega
         return sxy
 
-    def sga(self):
+    def run(self, method_name, /, **params):
+        """
+        Method runs partitioning method by its name and returns cost of the result, using cache if it was given.
+        Result depends on the graph, sizes, current partitions and state of the generator, all of them are
+        a part of the cache key. State of the generator after the run is stored with partitions,
+        so a hit leaves this object in the same state as the run would.
+        Runs without seed or with budget aren't reproducible and are never cached, neither is update,
+        as its result depends on the graph change log.
+        :param method_name: one of METHODS, positional only, so params may include method of e.g. streaming
+        :param params: keyword arguments of the method
+        :return: number of edges between partitions
+        """
+        assert method_name in METHODS, "Unknown method {}".format(method_name)
+        if self.__cache is None or self.__seed is None or self.__budget is not None or method_name == "update":
+            getattr(self, method_name)(**params)
+            return self.__calc_cut()
+        version = self.__graph.get_version()
+        if self.__fingerprint is None or self.__fingerprint[0] != version:
+            self.__fingerprint = (version, PartitionCache.fingerprint(self.__graph))
+        key = PartitionCache.key(graph=self.__fingerprint[1], method=method_name, params=params, sizes=self.__sizes,
+                                 vectorized=self.__vectorized, labels=self.__get_labels(),
+                                 rng=self.__rng.getstate())
+        entry = self.__cache.get(key)
+        if entry is not None:
+            self.__set_labels(entry["labels"])
+            self.__tolerance = entry["tolerance"]
+            version, internal, gauss = entry["rng"]
+            self.__rng.setstate((version, tuple(internal), gauss))
+            return entry["cost"]
+        getattr(self, method_name)(**params)
+        cost = self.__calc_cut()
+        self.__cache.put(key, {"labels": self.__get_labels(), "cost": cost, "tolerance": self.__tolerance,
+                               "rng": self.__rng.getstate()})
+        return cost
+
+    def sga(self, steepest=False):
         """
         MIN-BISECTION
         Simple greedy algorithm described in http://snovit.math.umu.se/~gerold/publ/bisection.pdf
         For now implemented for BISECTION only.
+        :param steepest: swap the best pair every time, pairs are found from D-values kept in buckets
+        and updated only for neighbours of swapped vertices, see KernighanLin.descend.
+        Stops in a local optimum as well, no swap of a pair decreases the cost
         """
         assert self.__n == 2, "This algorithm is implemented only for bisection"
+        self.__start_run("sga")
         self.random_partitions()
+        if steepest:
+            labels = self.__get_labels()
+            KernighanLin(self.__get_adjacency(), labels, self.__instrumentation, self.__budget).descend()
+            self.__set_labels(labels)
+            self.__end_run()
+            return
+        if self.__vectorized:
+            self.__sga_vectorized()
+            self.__end_run()
+            return
         # is improvement possible
         impr_poss = True
         while impr_poss:
+            self.__record_pass()
             impr_poss = False
+            masks = (None, None)
+            if isinstance(self.__graph, BitsetGraph):
+                masks = tuple(self.__graph.get_mask(partition) for partition in self.__partitions)
             for v1 in self.__partitions[0]:
                 for v2 in self.__partitions[1]:
-                    if self.__calculate_sxy(v1, v2, self.__partitions[0], self.__partitions[1]) > 0:
+                    if self.__budget is not None:
+                        if self.__budget.is_exhausted():
+                            break
+                        self.__budget.spend()
+                    if self.__calculate_sxy(v1, v2, self.__partitions[0], self.__partitions[1], masks) > 0:
                         self.__swap_vertices(v1, v2, self.__partitions[0], self.__partitions[1])
                         impr_poss = True
                         break
@@ -143,77 +404,346 @@ class Partitioning(object):
                 else:
                     continue
                 break
+        self.__end_run()
+
+    def __sga_vectorized(self):
+        """
+        Simple greedy algorithm with the whole S(x, y) matrix computed at once,
+        the best pair is swapped as long as it improves the cost.
+        """
+        kernels = self.__get_kernels()
+        labels = self.__get_labels()
+        while not self.__is_exhausted():
+            if self.__budget is not None:
+                self.__budget.spend(labels.count(0) * labels.count(1))
+            best = kernels.best_swap(labels)
+            if self.__instrumentation is not None:
+                self.__instrumentation.count(SXY_EVALUATIONS, labels.count(0) * labels.count(1))
+            if best is None or best[2] <= 0:
+                break
+            labels[best[0]], labels[best[1]] = 1, 0
+            if self.__instrumentation is not None:
+                self.__instrumentation.count(SWAPS)
+                self.__instrumentation.record_pass(kernels.cut(labels))
+        self.__set_labels(labels)
 
     def kla(self, random=True):
         """
         MIN-BISECTION
         Kernighan-Lin Algorithm described in paper.
+        D-values are kept in a gain table and updated incrementally after each swap, see KernighanLin.
         Bisection only
         """
         assert self.__n == 2, "This algorithm is implemented only for bisection"
+        self.__start_run("kla")
         if random:
             self.random_partitions()
-        best_x, best_y = set(self.__partitions[0]), set(self.__partitions[1])
-        best_cost = self.calc_cost()
-        improved = True
-        while improved:
-            improved = False
-            x_prim = set(self.__partitions[0])
-            y_prim = set(self.__partitions[1])
-            while x_prim and y_prim:
-                # get first items from x and from y
-                for x_elem in x_prim: break
-                for y_elem in y_prim: break
-                # calculate max sxy based on partitions, not x and y sets
-                max_value = self.__calculate_sxy(x_elem, y_elem, self.__partitions[0], self.__partitions[1])
-                for v1 in x_prim:
-                    for v2 in y_prim:
-                        val = self.__calculate_sxy(v1, v2, self.__partitions[0], self.__partitions[1])
-                        if val > max_value:
-                            max_value = val
-                            x_elem = v1
-                            y_elem = v2
-                self.__swap_vertices(x_elem, y_elem, self.__partitions[0], self.__partitions[1])
-                new_cost = self.calc_cost()
-                if new_cost < best_cost:
-                    best_x, best_y = set(self.__partitions[0]), set(self.__partitions[1])
-                    best_cost = new_cost
-                    improved = True
-                x_prim.remove(x_elem)
-                y_prim.remove(y_elem)
-            self.__partitions[0], self.__partitions[1] = set(best_x), set(best_y)
+        labels = self.__get_labels()
+        KernighanLin(self.__get_adjacency(), labels, self.__instrumentation, self.__budget).run()
+        self.__set_labels(labels)
+        self.__end_run()
+
+    def fm(self, random=True, imbalance=0):
+        """
+        MIN-BISECTION
+        Fiduccia-Mattheyses Algorithm, single vertex moves with gains kept in buckets.
+        Partition sizes may differ from sizes by imbalance percent of vertices, but at least by one vertex,
+        as otherwise no single move is possible.
+        Bisection only
+        :param random: start from random partitions, otherwise refine current ones
+        :param imbalance: allowed deviation from sizes in percents of all vertices
+        """
+        assert self.__n == 2, "This algorithm is implemented only for bisection"
+        self.__start_run("fm")
+        if random:
+            self.random_partitions()
+        tolerance = self.__get_tolerance(imbalance)
+        labels = self.__get_labels()
+        FiducciaMattheyses(self.__get_adjacency(), labels, self.__get_vertices_numbers(), tolerance,
+                           instrumentation=self.__instrumentation, budget=self.__budget).run()
+        self.__set_labels(labels)
+        self.__end_run()
+
+    def multilevel(self, imbalance=0, coarsest_n=DEFAULT_COARSEST_N):
+        """
+        MIN-BISECTION
+        Multilevel Algorithm: heavy edge matching coarsening, bisection of the coarsest graph
+        and FM refinement on every level while projecting back, see Multilevel.
+        Bisection only
+        :param imbalance: allowed deviation from sizes in percents of all vertices
+        :param coarsest_n: coarsening stops at graphs with at most that many vertices
+        """
+        assert self.__n == 2, "This algorithm is implemented only for bisection"
+        self.__start_run("multilevel")
+        tolerance = self.__get_tolerance(imbalance)
+        labels, _ = Multilevel(self.__get_adjacency(), self.__get_vertices_numbers(), tolerance, coarsest_n,
+                               self.__rng, self.__instrumentation, self.__budget).run()
+        self.__set_labels(labels)
+        self.__end_run()
+
+    def spectral(self):
+        """
+        MIN-K-WAY-PARTITIONING
+        Spectral partitioning: vertices are ordered by the Fiedler vector of the graph Laplacian
+        and split into consecutive parts matching sizes, see Spectral. Requires NumPy and SciPy.
+        Result is a good starting point for kla(False), fm(False) and kway_refine.
+        Budget is spent on LOBPCG iterations, when it is exhausted the current approximation is used.
+        """
+        self.__start_run("spectral")
+        labels = Spectral(self.__get_adjacency(), self.__rng, self.__budget).run(self.__get_vertices_numbers())
+        self.__set_labels(labels)
+        self.__end_run()
+
+    def streaming(self, method="fennel", passes=1, imbalance=0):
+        """
+        MIN-K-WAY-PARTITIONING
+        Streaming partitioning: vertices are read in index order and each one is assigned at once
+        to a partition chosen by LDG or Fennel score, see Streaming. Partitions never exceed sizes by more
+        than tolerance. Every pass after the first one restreams vertices to improve the cut.
+        Graphs not fitting in memory can be partitioned by Streaming directly, e.g. from GraphIO.stream_metis.
+        :param method: ldg or fennel
+        :param passes: number of passes over vertices, restreaming stops early when budget is exhausted
+        :param imbalance: allowed deviation from sizes in percents of all vertices
+        """
+        self.__start_run("streaming")
+        tolerance = self.__get_tolerance(imbalance)
+        n = self.__graph.get_n()
+        engine = Streaming(n, self.__graph.get_m(), self.__get_vertices_numbers(), tolerance, method, self.__rng)
+        for i in range(passes):
+            if i > 0 and self.__is_exhausted():
+                break
+            engine.run((v, self.__graph.get_neighbour_indices(v)) for v in range(n))
+            if self.__instrumentation is not None:
+                self.__instrumentation.count(NEIGHBOUR_SCANS, n)
+            if self.__budget is not None:
+                self.__budget.spend(n)
+            self.__set_labels(engine.get_labels())
+            self.__record_pass()
+        self.__end_run()
+
+    def recursive_bisection(self, method="multilevel"):
+        """
+        MIN-K-WAY-PARTITIONING
+        Partitions are split into two groups, graph is bisected with sizes of the groups and both halves
+        are partitioned recursively. Partition sizes match sizes exactly.
+        :param method: bisection method: kla, fm or multilevel
+        """
+        self.__start_run("recursive_bisection")
+        labels = RecursiveBisection(self.__get_adjacency(), self.__get_vertices_numbers(), method, self.__rng,
+                                    self.__instrumentation, self.__budget).run()
+        self.__set_labels(labels)
+        self.__end_run()
+
+    def kway_refine(self, imbalance=0):
+        """
+        MIN-K-WAY-PARTITIONING
+        Greedy refinement of current partitions, vertices are moved to partitions where they have most
+        neighbours. Connectivity of every vertex to every partition is updated locally after a move.
+        :param imbalance: allowed deviation from sizes in percents of all vertices
+        """
+        labels = self.__get_labels()
+        assert None not in labels, "All vertices have to be assigned to partitions"
+        self.__start_run("kway_refine")
+        tolerance = self.__get_tolerance(imbalance)
+        KWayRefinement(self.__get_adjacency(), labels, self.__get_vertices_numbers(), tolerance, self.__rng,
+                       self.__instrumentation, self.__budget).run()
+        self.__set_labels(labels)
+        self.__end_run()
+
+    def __get_partition_number(self, vertex):
+        label = self.__state.get(self.__graph.get_vertex_index(vertex))
+        return None if label == UNASSIGNED else label
+
+    def __expand(self, region, frontier):
+        """
+        Method adds neighbours of frontier vertices to region.
+        :return: vertices added to region, the next frontier
+        """
+        added = []
+        for vertex in frontier:
+            for neigh in self.__graph.get_neighbours(vertex):
+                if neigh not in region:
+                    region.add(neigh)
+                    added.append(neigh)
+        return added
+
+    def __move_gain(self, vertex, source, target):
+        gain = 0
+        for neigh in self.__graph.get_neighbours(vertex):
+            if neigh in self.__partitions[target]:
+                gain += 1
+            elif neigh in self.__partitions[source]:
+                gain -= 1
+        return gain
+
+    def update(self, imbalance=0, radius=2):
+        """
+        MIN-K-WAY-PARTITIONING
+        Incremental repartitioning after graph changes made since partitions were computed.
+        Removed vertices are dropped, added vertices join partition where most of their neighbours are,
+        then only the region within radius hops of changed vertices is rebalanced and greedily refined.
+        Work depends on size of the changes and their neighbourhood, not on size of the graph.
+        :param imbalance: allowed deviation from sizes in percents of all vertices
+        :param radius: number of hops around changed vertices which may be moved
+        """
+        assert any(self.__partitions), "Partitions have to be computed before update"
+        self.__start_run("update")
+        tolerance = self.__get_tolerance(imbalance)
+        v_sizes = self.__get_vertices_numbers()
+        touched = set()
+        # indices of partitions follow indices of the graph as changes are replayed
+        for change in self.__graph.get_changes(self.__graph_version):
+            if change[0] == ADD_VERTEX:
+                self.__state.append()
+                touched.add(change[1])
+            elif change[0] == REMOVE_VERTEX:
+                self.__state.delete(change[2])
+                touched.add(change[1])
+            else:
+                touched.update(change[1:])
+        touched = [vertex for vertex in touched if self.__graph.has_vertex(vertex)]
+        for vertex in touched:
+            if self.__get_partition_number(vertex) is not None:
+                continue
+            counts = [0] * self.__n
+            for neigh in self.__graph.get_neighbours(vertex):
+                label = self.__get_partition_number(neigh)
+                if label is not None:
+                    counts[label] += 1
+            # the fullest partitions are skipped, ties are broken by free space
+            label = max(range(self.__n), key=lambda i: (len(self.__partitions[i]) < v_sizes[i] + tolerance,
+                                                        counts[i], v_sizes[i] - len(self.__partitions[i])))
+            self.__state.assign(self.__graph.get_vertex_index(vertex), label)
+        self.__graph_version = self.__graph.get_version()
+        region = set(touched)
+        frontier = touched
+        for _ in range(radius):
+            frontier = self.__expand(region, frontier)
+        self.__rebalance_region(region, frontier, v_sizes, tolerance)
+        self.__refine_region(region, v_sizes, tolerance)
+        self.__end_run()
+
+    def __rebalance_region(self, region, frontier, v_sizes, tolerance):
+        """
+        Method moves vertices with the highest gains from the most overfull to the most underfull partition
+        until all partitions fit tolerance. Region grows by one hop when the overfull partition has no vertex in it.
+        """
+        while True:
+            excess = [len(partition) - v_size for partition, v_size in zip(self.__partitions, v_sizes)]
+            source = max(range(self.__n), key=lambda i: excess[i])
+            target = min(range(self.__n), key=lambda i: excess[i])
+            if excess[source] <= tolerance and excess[target] >= -tolerance:
+                return
+            candidates = [vertex for vertex in region if vertex in self.__partitions[source]]
+            if not candidates:
+                frontier = self.__expand(region, frontier)
+                if not frontier:
+                    # region covers its whole component, partition may be filled from anywhere
+                    region.update(self.__partitions[source])
+                continue
+            best = max(candidates, key=lambda vertex: self.__move_gain(vertex, source, target))
+            self.__state.assign(self.__graph.get_vertex_index(best), target)
+            if self.__instrumentation is not None:
+                self.__instrumentation.count(MOVES)
+
+    def __refine_region(self, region, v_sizes, tolerance):
+        """
+        Method moves region vertices to partitions where they have the most neighbours while it lowers the cut
+        and keeps partitions within tolerance. Vertices outside region stay where they are.
+        """
+        vertices = list(region)
+        moved = True
+        while moved and not self.__is_exhausted():
+            self.__rng.shuffle(vertices)
+            moved = 0
+            for vertex in vertices:
+                if self.__budget is not None:
+                    if self.__budget.is_exhausted():
+                        break
+                    self.__budget.spend()
+                current = self.__get_partition_number(vertex)
+                if len(self.__partitions[current]) - 1 < v_sizes[current] - tolerance:
+                    continue
+                counts = [0] * self.__n
+                for neigh in self.__graph.get_neighbours(vertex):
+                    counts[self.__get_partition_number(neigh)] += 1
+                best, best_gain = None, 0
+                for label, count in enumerate(counts):
+                    if label == current or count - counts[current] <= best_gain:
+                        continue
+                    if len(self.__partitions[label]) + 1 > v_sizes[label] + tolerance:
+                        continue
+                    best, best_gain = label, count - counts[current]
+                if best is not None:
+                    self.__state.assign(self.__graph.get_vertex_index(vertex), best)
+                    moved += 1
+            if self.__instrumentation is not None:
+                self.__instrumentation.count(MOVES, moved)
+            self.__record_pass()
 
     def rbha(self):
         """
         MIN-BISECTION
         Randomized-Black-Holes Algorithm
+        Every set keeps its frontier: multiset of not assigned ends of edges leaving the set, one entry per edge.
+        Entries are added when the set grows and dropped when drawn after their vertex was assigned,
+        so an edge is still chosen uniformly, in O(1) amortized time, and the whole run is O(n + m).
         """
-        x_set, y_set = set(), set()
-        sets = [x_set, y_set]
+        self.__start_run("rbha")
         v_sizes = self.__get_vertices_numbers()
-        while len(x_set) < v_sizes[0] or len(y_set) < v_sizes[1]:
-            # set X
-            for current_set in sets:
+        labels = [None] * self.__graph.get_n()
+        counts = [0, 0]
+        frontiers = [[], []]
+        # not assigned vertices indices, a vertex is removed by putting the last one at its position
+        free = list(range(len(labels)))
+        positions = list(range(len(labels)))
+        while counts[0] < v_sizes[0] or counts[1] < v_sizes[1]:
+            if self.__is_exhausted():
+                break
+            for label, frontier in enumerate(frontiers):
                 # in case of not equal partition sizes
-                if len(current_set) == v_sizes[sets.index(current_set)]:
+                if counts[label] == v_sizes[label]:
                     continue
-                edges = []
-                for x in current_set:
-                    nbs = self.__graph.get_neighbours(x)
-                    for nb in nbs:
-                        if nb not in x_set and nb not in y_set:
-                            edges.append((x, nb))
-                if len(edges) > 0:
-                    vertex = random.choice(edges)[1]
-                else:
-                    vertices = [v for v in self.__graph.get_vertices() if v not in x_set and v not in y_set]
+                vertex = None
+                while frontier:
+                    k = self.__rng.randrange(len(frontier))
+                    candidate = frontier[k]
+                    frontier[k] = frontier[-1]
+                    frontier.pop()
+                    if labels[candidate] is None:
+                        vertex = candidate
+                        break
+                if vertex is None:
                     # this partition is full
-                    if len(vertices) == 0:
+                    if not free:
                         break
-                    vertex = random.choice(vertices)
-                current_set.add(vertex)
-        self.__partitions[0] = set(x_set)
-        self.__partitions[1] = set(y_set)
+                    vertex = free[self.__rng.randrange(len(free))]
+                labels[vertex] = label
+                counts[label] += 1
+                last = free.pop()
+                if last != vertex:
+                    free[positions[vertex]] = last
+                    positions[last] = positions[vertex]
+                frontier.extend(nb for nb in self.__graph.get_neighbour_indices(vertex) if labels[nb] is None)
+                if self.__instrumentation is not None:
+                    self.__instrumentation.count(NEIGHBOUR_SCANS)
+                if self.__budget is not None:
+                    self.__budget.spend()
+        if counts[0] < v_sizes[0] or counts[1] < v_sizes[1]:
+            self.__fill_randomly(labels, v_sizes)
+        self.__set_labels(labels)
+        self.__end_run()
+
+    def __fill_randomly(self, labels, v_sizes):
+        """
+        Method assigns vertices which are in none of partitions randomly, so partitions reach their sizes.
+        :param labels: list of 0/1 labels indexed by vertex index, None for unassigned vertices, modified in place
+        """
+        indices = [index for index, label in enumerate(labels) if label is None]
+        self.__rng.shuffle(indices)
+        missing = v_sizes[0] - labels.count(0)
+        for k, index in enumerate(indices):
+            labels[index] = 0 if k < missing else 1
 
     def bfs_partitions(self):
         """
@@ -222,21 +752,24 @@ class Partitioning(object):
         MAX BIS
         :return:
         """
+        self.__start_run("bfs_partitions")
         self.__clear_partitions()
         vertices = set(self.__graph.get_vertices())
-        root = random.sample(vertices, 1).pop()
-        print(self.__graph.get_vertices().index(root))
+        root = self.__rng.choice(self.__graph.get_vertices())
         vertices.remove(root)
-        queue = [(root, 0)]
+        queue = collections.deque([(root, 0)])
         while queue:
-            (u, p) = queue.pop(0)
-            self.__partitions[p].add(u)
+            (u, p) = queue.popleft()
+            self.__state.assign(self.__graph.get_vertex_index(u), p)
             for nb in self.__graph.get_neighbours(u):
                 if nb in vertices:
                     queue.append((nb, int(not p)))
                     vertices.remove(nb)
+        self.__end_run()
 
     def lpa_vertex_cost(self, v1, v2, p0, p1, p2, p3):
+        if self.__instrumentation is not None:
+            self.__instrumentation.count(SXY_EVALUATIONS)
         ov2p1 = self.__get_vertex_cost(v2, p1)
         ov1p0 = self.__get_vertex_cost(v1, p0)
         iv2p3 = self.__get_vertex_cost(v2, p3)
@@ -247,8 +780,10 @@ class Partitioning(object):
         return sxy
 
     def lpa_calc_cost(self, bis, supgraph):
+        if self.__instrumentation is not None:
+            self.__instrumentation.count(CALC_COST_CALLS)
         cost = 0
-        partitions = [self.__partitions[0].union(bis.__partitions[1]), self.__partitions[1].union(bis.__partitions[0])]
+        partitions = [self.__partitions[0] | bis.__partitions[1], self.__partitions[1] | bis.__partitions[0]]
         for partition in partitions:
             assert len(partition) > self.__n / 2 - 1, "Partition too small"
             for v1 in partition:
@@ -263,14 +798,18 @@ class Partitioning(object):
 
     def find_best_lpa(self, bis, supgraph):
         self.random_partitions()
-        best_x, best_y = set(self.__partitions[0]), set(self.__partitions[1])
+        best = self.__state.snapshot()
         best_cost = self.lpa_calc_cost(bis, supgraph)
         improved = True
-        while improved:
+        while improved and not self.__is_exhausted():
+            if self.__instrumentation is not None:
+                self.__instrumentation.record_pass(best_cost)
             improved = False
             x_prim = set(self.__partitions[0])
             y_prim = set(self.__partitions[1])
-            while x_prim and y_prim:
+            while x_prim and y_prim and not self.__is_exhausted():
+                if self.__budget is not None:
+                    self.__budget.spend(len(x_prim) * len(y_prim))
                 # get first items from x and from y
                 for x_elem in x_prim: break
                 for y_elem in y_prim: break
@@ -286,12 +825,12 @@ class Partitioning(object):
                 self.__swap_vertices(x_elem, y_elem, self.__partitions[0], self.__partitions[1])
                 new_cost = self.lpa_calc_cost(bis, supgraph)
                 if new_cost < best_cost:
-                    best_x, best_y = set(self.__partitions[0]), set(self.__partitions[1])
+                    best = self.__state.snapshot()
                     best_cost = new_cost
                     improved = True
                 x_prim.remove(x_elem)
                 y_prim.remove(y_elem)
-            self.__partitions[0], self.__partitions[1] = set(best_x), set(best_y)
+            self.__state.restore(best)
 
     def lpa(self):
         """
@@ -299,39 +838,123 @@ class Partitioning(object):
         :return:
         """
         assert self.__n == 2, "This algorithm is implemented only for bisection"
+        self.__start_run("lpa")
         if self.__graph.get_n() == 2:
-            vertices = self.__graph.get_vertices()
-            self.__partitions[0] = set()
-            self.__partitions[0].add(vertices[0])
-            self.__partitions[1] = set()
-            self.__partitions[1].add(vertices[1])
+            self.__set_labels([0, 1])
+            self.__end_run()
             return
         self.kla()
+        if self.__is_exhausted():
+            self.__end_run()
+            return
+        kla_labels, kla_cost = self.__get_labels(), self.__calc_cut()
         s1 = self.__graph.get_subgraph(self.__partitions[0])
         s2 = self.__graph.get_subgraph(self.__partitions[1])
 
-        bis1 = Partitioning(s1)
-        bis2 = Partitioning(s2)
+        bis1 = Partitioning(s1, seed=self.__rng.getrandbits(64), instrumentation=self.__instrumentation,
+                            budget=self.__budget)
+        bis2 = Partitioning(s2, seed=self.__rng.getrandbits(64), instrumentation=self.__instrumentation,
+                            budget=self.__budget)
         bis1.lpa()
         #bis1.kla()
         bis2.find_best_lpa(bis1, self.__graph)
 
-        self.__partitions[0] = bis1.__partitions[0].union(bis2.__partitions[1])
-        self.__partitions[1] = bis1.__partitions[1].union(bis2.__partitions[0])
+        labels = [None] * self.__graph.get_n()
+        for label, partitions in enumerate(((bis1.__partitions[0], bis2.__partitions[1]),
+                                            (bis1.__partitions[1], bis2.__partitions[0]))):
+            for partition in partitions:
+                for vertex in partition:
+                    labels[self.__graph.get_vertex_index(vertex)] = label
+        self.__set_labels(labels)
         self.kla(False)
+        # recursion stopped by budget may leave partitions worse than the first kla
+        if self.__is_exhausted() and self.__calc_cut() > kla_cost:
+            self.__set_labels(kla_labels)
+        self.__end_run()
 
-    def ikla(self):
-        self.kla()
-        best0 = self.__partitions[0]
-        best1 = self.__partitions[1]
-        best_cost = self.calc_cost()
-        for _ in range(100):
-            self.__clear_partitions()
+    def ikla(self, restarts=100, workers=1):
+        """
+        MIN-BISECTION
+        Iterated Kernighan-Lin Algorithm, best of independent kla runs from random partitions.
+        Every restart has its own seed drawn from this object's generator, so the result
+        doesn't depend on number of workers. When budget is exhausted no more restarts are started
+        and the best one of those already run is used, at least one restart is always run.
+        Restarts in worker processes get deadline and remaining evaluations of the budget, evaluations they spend
+        are charged when they return and restarts still running are cancelled when the budget runs out.
+        :param restarts: number of kla runs
+        :param workers: number of worker processes, all cores if None,
+        restarts run by other processes are reported only as a part of ikla run
+        """
+        assert restarts >= 1, "At least one restart is required"
+        self.__start_run("ikla")
+        base_seed = self.__rng.getrandbits(64)
+        tasks = ((self.__sizes, self.__vectorized, base_seed + i) for i in range(restarts))
+        if workers is None:
+            workers = os.cpu_count()
+        results = []
+        if workers == 1:
+            for task in tasks:
+                results.append(_kla_restart(self.__graph, *task, self.__instrumentation, self.__budget))
+                if self.__is_exhausted():
+                    break
+        else:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("fork" if "fork" in methods else None)
+            budget = self.__budget
+            if budget is None:
+                limits = (False, None, None)
+            else:
+                limits = (True, budget.get_remaining_evaluations(), budget.get_deadline())
+            tasks = (task + limits for task in tasks)
+            cancelled = context.Event()
+            # leaving the pool terminates restarts which are still running
+            with context.Pool(workers, _init_ikla_worker, (self.__graph, cancelled)) as pool:
+                if budget is None:
+                    chunksize = max(1, restarts // (4 * workers))
+                    results.extend(result[:2] for result in pool.imap(_ikla_worker_restart, tasks, chunksize))
+                else:
+                    # results of chunksize 1 come one by one and can be waited for with timeout
+                    iterator = pool.imap(_ikla_worker_restart, tasks)
+                    while True:
+                        try:
+                            cost, labels, spent = iterator.next(IKLA_POLL_INTERVAL)
+                        except multiprocessing.TimeoutError:
+                            # cancel or deadline while restarts run, they stop at their best prefix and return
+                            if budget.is_exhausted():
+                                cancelled.set()
+                            continue
+                        except StopIteration:
+                            break
+                        results.append((cost, labels))
+                        budget.spend(spent)
+                        if budget.is_exhausted():
+                            cancelled.set()
+                            break
+        # min keeps the first restart among equal costs
+        best_cost, best_labels = min(results, key=lambda result: result[0])
+        self.__set_labels(best_labels)
+        self.__end_run()
+
+    def exact(self, restarts=10):
+        """
+        MIN-BISECTION
+        Exact minimum bisection by branch and bound over bitsets of assigned vertices, see BranchAndBound.
+        Best of restarts kla runs is the initial upper bound. Time grows exponentially with n and density,
+        sparse graphs of 40-60 vertices take seconds. When budget is exhausted the best bisection found so far
+        is kept and it may not be optimal.
+        Bisection only
+        :param restarts: number of kla runs giving the initial bisection
+        """
+        assert self.__n == 2, "This algorithm is implemented only for bisection"
+        assert restarts >= 1, "At least one restart is required"
+        self.__start_run("exact")
+        best_cost, best_labels = None, None
+        for _ in range(restarts):
             self.kla()
-            cost = self.calc_cost()
-            if cost < best_cost:
-                best_cost = cost
-                best0 = self.__partitions[0]
-                best1 = self.__partitions[1]
-        self.__partitions[0] = best0
-        self.__partitions[1] = best1
+            cost = self.__calc_cut()
+            if best_cost is None or cost < best_cost:
+                best_cost, best_labels = cost, self.__get_labels()
+        labels, _ = BranchAndBound(self.__get_adjacency(), self.__get_vertices_numbers(), best_labels,
+                                   self.__instrumentation, self.__budget).run()
+        self.__set_labels(labels)
+        self.__end_run()
@@ -0,0 +1,209 @@
+import math
+from PartitioningLib.Instrumentation import SEARCH_NODES, BOUND_EVALUATIONS
+
+
+class BranchAndBound(object):
+    """
+    Exact minimum bisection by depth-first branch and bound, for small graphs.
+    Sets of assigned vertices are bitsets, so edges between a vertex and a set are counted by one popcount
+    and the cut grows incrementally with every assignment.
+    Lower bound of a node is the cut so far plus two bounds on disjoint sets of edges:
+    edge-disjoint paths from partition 0 to partition 1 through unassigned vertices, every one of them is cut,
+    and, for edges not on the paths, the cheaper side of every unassigned vertex by its degrees to partitions,
+    with sides chosen for all unassigned vertices optimally under remaining sizes.
+    Unassigned vertex of the highest degree is branched on, the child with the lower bound first.
+    For equal sizes the first vertex is fixed to partition 0, as swapping partitions gives the same cut.
+    """
+
+    def __init__(self, adjacency, v_sizes, labels=None, instrumentation=None, budget=None):
+        """
+        :param adjacency: list of neighbours indices lists
+        :param v_sizes: numbers of vertices of both partitions
+        :param labels: partition numbers indexed by vertex index of a known bisection, its cut is the initial
+        upper bound, None if there is no such bisection
+        :param instrumentation: Instrumentation receiving numbers of search nodes and bound evaluations,
+        None disables it
+        :param budget: Budget spent on search nodes, when it is exhausted the best bisection found so far is kept
+        """
+        self.__instrumentation = instrumentation
+        self.__n = len(adjacency)
+        assert len(v_sizes) == 2 and sum(v_sizes) == self.__n, "Sizes don't match number of vertices"
+        self.__sizes = v_sizes
+        self.__budget = budget
+        self.__rows = [0] * self.__n
+        for i, row in enumerate(adjacency):
+            for nb in row:
+                self.__rows[i] |= 1 << nb
+        self.__degrees = [row.bit_count() for row in self.__rows]
+        self.__best_labels = list(labels) if labels is not None else None
+        self.__best = self.__cut(labels) if labels is not None else math.inf
+        self.__nodes = 0
+        self.__bounds = 0
+        self.__optimal = True
+
+    def __cut(self, labels):
+        return sum(1 for i in range(self.__n) for nb in range(i)
+                   if self.__rows[i] >> nb & 1 and labels[i] != labels[nb])
+
+    def get_nodes(self):
+        return self.__nodes
+
+    def is_optimal(self):
+        """
+        :return: False if budget stopped the search before optimality of the best bisection was proven
+        """
+        return self.__optimal
+
+    def run(self):
+        """
+        Method searches for bisection with cut smaller than the best one known.
+        :return: labels of the best bisection, cut of the best bisection
+        """
+        nodes, bounds = self.__nodes, self.__bounds
+        self.__search(0, 0, self.__sizes[0], self.__sizes[1], 0)
+        if self.__instrumentation is not None:
+            self.__instrumentation.count(SEARCH_NODES, self.__nodes - nodes)
+            self.__instrumentation.count(BOUND_EVALUATIONS, self.__bounds - bounds)
+            self.__instrumentation.record_pass(self.__best)
+        return self.__best_labels, self.__best
+
+    def __pack_paths(self, free, to_a, to_b):
+        """
+        Method finds maximum number of edge-disjoint paths from partition 0 to partition 1 through unassigned
+        vertices by augmenting paths.
+        :param free: bitset of unassigned vertices
+        :param to_a: number of neighbours in partition 0 of every unassigned vertex
+        :param to_b: number of neighbours in partition 1 of every unassigned vertex
+        :return: number of paths, number of path edges to partition 0, to partition 1 and to unassigned vertices
+        of every unassigned vertex
+        """
+        rows = self.__rows
+        # paths through one vertex first
+        from_a = {u: min(to_a[u], to_b[u]) for u in to_a}
+        into_b = dict(from_a)
+        paths = sum(from_a.values())
+        # bitsets of vertices with edges to partition 0 or 1 not on paths yet
+        sources = sum(1 << u for u in to_a if from_a[u] < to_a[u])
+        sinks = sum(1 << u for u in to_b if into_b[u] < to_b[u])
+        # bitsets of neighbours every vertex sends a path to, edges used in the opposite direction are free
+        used = dict.fromkeys(to_a, 0)
+        inner = dict.fromkeys(to_a, 0)
+        while sources and sinks:
+            queue = []
+            parent = {}
+            targets = sources
+            while targets:
+                low = targets & -targets
+                targets ^= low
+                queue.append(low.bit_length() - 1)
+            visited = sources
+            end = None
+            for u in queue:
+                targets = rows[u] & free & ~visited & ~used[u]
+                if not targets:
+                    continue
+                visited |= targets
+                if targets & sinks:
+                    end = (targets & sinks & -(targets & sinks)).bit_length() - 1
+                    parent[end] = u
+                    break
+                while targets:
+                    low = targets & -targets
+                    targets ^= low
+                    w = low.bit_length() - 1
+                    parent[w] = u
+                    queue.append(w)
+            if end is None:
+                break
+            into_b[end] += 1
+            if into_b[end] == to_b[end]:
+                sinks ^= 1 << end
+            w = end
+            while w in parent:
+                u = parent[w]
+                if used[w] >> u & 1:
+                    used[w] ^= 1 << u
+                    inner[u] -= 1
+                    inner[w] -= 1
+                else:
+                    used[u] |= 1 << w
+                    inner[u] += 1
+                    inner[w] += 1
+                w = u
+            from_a[w] += 1
+            if from_a[w] == to_a[w]:
+                sources ^= 1 << w
+            paths += 1
+        return paths, from_a, into_b, inner
+
+    def __search(self, mask_a, mask_b, left_a, left_b, cut):
+        self.__nodes += 1
+        if self.__budget is not None:
+            self.__budget.spend()
+            if self.__budget.is_exhausted():
+                self.__optimal = False
+                return
+        n = self.__n
+        rows = self.__rows
+        free = ((1 << n) - 1) ^ mask_a ^ mask_b
+        if left_a == 0 or left_b == 0:
+            # every unassigned vertex goes to the same partition, only its edges to the other one are cut
+            other = mask_a if left_a == 0 else mask_b
+            cut += sum((rows[u] & other).bit_count() for u in range(n) if free >> u & 1)
+            if cut < self.__best:
+                self.__best = cut
+                if left_a == 0:
+                    mask_b |= free
+                self.__best_labels = [mask_b >> u & 1 for u in range(n)]
+            return
+        self.__bounds += 1
+        to_a = {}
+        to_b = {}
+        for u in range(n):
+            if free >> u & 1:
+                to_a[u] = (rows[u] & mask_a).bit_count()
+                to_b[u] = (rows[u] & mask_b).bit_count()
+        paths, paths_a, paths_b, paths_inner = self.__pack_paths(free, to_a, to_b)
+        if cut + paths >= self.__best:
+            return
+        # doubled cost of every unassigned vertex in partition 0 and in partition 1 on edges which aren't on paths,
+        # edges among unassigned vertices are shared by two vertices
+        total = 0
+        candidates = []
+        for u in to_a:
+            inner = (rows[u] & free).bit_count() - paths_inner[u]
+            cost_a = 2 * (to_b[u] - paths_b[u]) + max(0, inner - left_a + 1)
+            cost_b = 2 * (to_a[u] - paths_a[u]) + max(0, inner - left_b + 1)
+            total += cost_b
+            candidates.append((cost_a - cost_b, u))
+        candidates.sort()
+        bound = total + sum(difference for difference, _ in candidates[:left_a])
+        # doubled bound rounded up reaches the best cut
+        if bound >= 2 * (self.__best - cut - paths) - 1:
+            return
+        last = candidates[left_a - 1][0]
+        following = candidates[left_a][0]
+        # bound of a child is the bound of this node with the vertex moved to the other partition,
+        # a vertex of the highest degree is branched on, the one with the higher bound of a child among them
+        branch = None
+        for position, (difference, u) in enumerate(candidates):
+            if position < left_a:
+                bounds = (bound, bound - difference + following)
+            else:
+                bounds = (bound + difference - last, bound)
+            key = (self.__degrees[u], max(bounds))
+            if branch is None or key > branch[0]:
+                branch = (key, u, bounds)
+        _, v, bounds = branch
+        bit = 1 << v
+        parts = sorted((0, 1), key=lambda part: bounds[part])
+        if mask_a == mask_b == 0 and self.__sizes[0] == self.__sizes[1]:
+            parts = [0]
+        for part in parts:
+            # bounds of children hold with the same paths, the best cut may have decreased in the first child
+            if bounds[part] >= 2 * (self.__best - cut - paths) - 1:
+                continue
+            if part == 0:
+                self.__search(mask_a | bit, mask_b, left_a - 1, left_b, cut + to_b[v])
+            else:
+                self.__search(mask_a, mask_b | bit, left_a, left_b - 1, cut + to_a[v])
@@ -0,0 +1,56 @@
+import threading
+import time
+
+
+class Budget(object):
+    """
+    Limit of work of partitioning algorithms: wall time deadline, number of evaluations or both.
+    Algorithms check it between steps and, when it is exhausted, stop and keep the best partition found so far.
+    cancel() may be called from another thread to stop running algorithm the same way.
+    One evaluation is one S(x, y) or gain evaluation, one vertex move or one swap, depending on algorithm.
+    """
+
+    def __init__(self, seconds=None, evaluations=None, deadline=None, cancelled=None):
+        """
+        :param seconds: wall time limit counted from now, unlimited if None
+        :param evaluations: number of evaluations, unlimited if None
+        :param deadline: time.monotonic() value ending the budget, used instead of seconds,
+        e.g. deadline of a parent budget in a worker process
+        :param cancelled: event set by cancel(), may be shared with other processes, e.g. multiprocessing Event,
+        a new threading Event if None
+        """
+        assert seconds is None or deadline is None, "Only one of seconds and deadline can be given"
+        self.__deadline = time.monotonic() + seconds if seconds is not None else deadline
+        self.__evaluations = evaluations
+        self.__cancelled = cancelled if cancelled is not None else threading.Event()
+
+    def cancel(self):
+        self.__cancelled.set()
+
+    def is_cancelled(self):
+        return self.__cancelled.is_set()
+
+    def spend(self, evaluations=1):
+        if self.__evaluations is not None:
+            self.__evaluations -= evaluations
+
+    def get_remaining_evaluations(self):
+        return self.__evaluations
+
+    def get_deadline(self):
+        """
+        :return: time.monotonic() value ending the budget, None if time is unlimited
+        """
+        return self.__deadline
+
+    def get_remaining_time(self):
+        if self.__deadline is None:
+            return None
+        return max(0.0, self.__deadline - time.monotonic())
+
+    def is_exhausted(self):
+        if self.__cancelled.is_set():
+            return True
+        if self.__evaluations is not None and self.__evaluations <= 0:
+            return True
+        return self.__deadline is not None and time.monotonic() >= self.__deadline
@@ -0,0 +1,197 @@
+from PartitioningLib.GainBuckets import GainBuckets
+from PartitioningLib.Instrumentation import MOVES, NEIGHBOUR_SCANS
+
+
+# number of vertices checked when the highest gain vertex of a partition is too heavy to move
+SCAN_LIMIT = 32
+
+
+class FiducciaMattheyses(object):
+    """
+    Fiduccia-Mattheyses bisection refinement working on vertex indices.
+    Vertices are moved one at a time between partitions, highest gain first, as long as
+    weight of partition 0 stays within tolerance from its target. Every moved vertex is locked
+    until the end of the pass and the pass is rolled back to its best prefix.
+    Gains are kept in GainBuckets, so one pass costs O(n + m).
+    """
+
+    def __init__(self, adjacency, labels, targets, tolerance, edge_weights=None, vertex_weights=None,
+                 boundary_only=False, max_idle_moves=None, instrumentation=None, budget=None):
+        """
+        :param adjacency: list of neighbours indices lists
+        :param labels: list of 0/1 partition labels, modified in place
+        :param targets: target weights of both partitions
+        :param tolerance: allowed difference between partition 0 weight and its target
+        :param edge_weights: lists of weights parallel to adjacency, all edges weigh 1 if None
+        :param vertex_weights: list of vertices weights, all vertices weigh 1 if None
+        :param boundary_only: consider only vertices with a neighbour in the other partition
+        :param max_idle_moves: pass ends after that many moves without improvement, passes are full if None
+        :param instrumentation: Instrumentation receiving counters and passes, None disables it
+        :param budget: Budget spent on moves, pass stops at the best prefix when it runs out
+        """
+        n = len(adjacency)
+        self.__adjacency = adjacency
+        self.__edge_weights = edge_weights if edge_weights is not None else [[1] * len(row) for row in adjacency]
+        self.__vertex_weights = vertex_weights if vertex_weights is not None else [1] * n
+        # with equal weights either every move from a partition is feasible or none is
+        self.__uniform = n == 0 or min(self.__vertex_weights) == max(self.__vertex_weights)
+        self.__labels = labels
+        self.__targets = targets
+        self.__tolerance = tolerance
+        self.__boundary_only = boundary_only
+        self.__max_idle_moves = max_idle_moves
+        self.__instrumentation = instrumentation
+        self.__budget = budget
+        self.__locked = [False] * n
+        self.__part_weights = [0, 0]
+        for v, label in enumerate(labels):
+            self.__part_weights[label] += self.__vertex_weights[v]
+        self.__gains = [0] * n
+        self.__cut = self.__calculate_gains()
+        if instrumentation is not None:
+            instrumentation.count(NEIGHBOUR_SCANS, n)
+
+    def __calculate_gains(self):
+        """
+        Method calculates gains (external minus internal weight) of all vertices.
+        :return: cut weight of current partition
+        """
+        cut = 0
+        labels = self.__labels
+        for v, row in enumerate(self.__adjacency):
+            gain = 0
+            for nb, weight in zip(row, self.__edge_weights[v]):
+                if labels[nb] != labels[v]:
+                    gain += weight
+                    cut += weight
+                else:
+                    gain -= weight
+            self.__gains[v] = gain
+        return cut // 2
+
+    def get_cut(self):
+        return self.__cut
+
+    def __imbalance(self):
+        return abs(self.__part_weights[0] - self.__targets[0])
+
+    def __state(self):
+        """
+        Key of current state, lower is better. States outside tolerance are always worse than balanced ones.
+        """
+        imbalance = self.__imbalance()
+        return max(0, imbalance - self.__tolerance), self.__cut, imbalance
+
+    def run(self, max_passes=None):
+        """
+        Method runs passes until a pass doesn't improve the partition or budget is exhausted.
+        :param max_passes: limit of passes, unlimited if None
+        :return: cut weight
+        """
+        passes = 0
+        while (max_passes is None or passes < max_passes) and self.run_pass():
+            passes += 1
+            if self.__budget is not None and self.__budget.is_exhausted():
+                break
+        return self.__cut
+
+    def run_pass(self):
+        """
+        Method performs one pass of moves, then rolls back to the best prefix.
+        :return: True if the partition was improved
+        """
+        buckets = [GainBuckets(), GainBuckets()]
+        for v, label in enumerate(self.__labels):
+            if not self.__boundary_only or self.__is_boundary(v):
+                buckets[label].insert(v, self.__gains[v])
+        moves = []
+        start_state = best_state = self.__state()
+        best_moves = 0
+        while self.__max_idle_moves is None or len(moves) - best_moves < self.__max_idle_moves:
+            if self.__budget is not None:
+                if self.__budget.is_exhausted():
+                    break
+                self.__budget.spend()
+            v = self.__select(buckets)
+            if v is None:
+                break
+            buckets[self.__labels[v]].remove(v)
+            self.__locked[v] = True
+            self.__move(v, buckets)
+            moves.append(v)
+            state = self.__state()
+            if state < best_state:
+                best_state, best_moves = state, len(moves)
+        for v in moves:
+            self.__locked[v] = False
+        for v in reversed(moves[best_moves:]):
+            self.__move(v, None)
+        if self.__instrumentation is not None:
+            self.__instrumentation.count(MOVES, len(moves))
+            self.__instrumentation.count(NEIGHBOUR_SCANS, 2 * len(moves) - best_moves)
+            self.__instrumentation.record_pass(self.__cut)
+        return best_state < start_state
+
+    def __is_boundary(self, v):
+        label = self.__labels[v]
+        for nb in self.__adjacency[v]:
+            if self.__labels[nb] != label:
+                return True
+        return False
+
+    def __is_feasible(self, v):
+        """
+        Method checks if moving v keeps partition 0 weight within tolerance or at least improves balance.
+        """
+        weight = self.__vertex_weights[v]
+        shift = -weight if self.__labels[v] == 0 else weight
+        imbalance = abs(self.__part_weights[0] + shift - self.__targets[0])
+        return imbalance <= self.__tolerance or imbalance < self.__imbalance()
+
+    def __select(self, buckets):
+        """
+        Method selects feasible vertex with the highest gain, moves from heavier partition win ties.
+        :return: vertex or None if there is no feasible move
+        """
+        best = None
+        for side in (0, 1):
+            candidate = buckets[side].peek()
+            if candidate is not None and not self.__is_feasible(candidate):
+                candidate = None
+                if not self.__uniform:
+                    for checked, (v, _) in enumerate(buckets[side].iterate()):
+                        if checked == SCAN_LIMIT:
+                            break
+                        if self.__is_feasible(v):
+                            candidate = v
+                            break
+            if candidate is None:
+                continue
+            gain = self.__gains[candidate]
+            overweight = self.__part_weights[side] - self.__targets[side]
+            if best is None or (gain, overweight) > best[1:]:
+                best = (candidate, gain, overweight)
+        return best[0] if best is not None else None
+
+    def __move(self, v, buckets):
+        """
+        Method moves v to the other partition and updates gains of its neighbours.
+        Buckets are updated only for neighbours which are not locked, in boundary mode
+        neighbours which became boundary vertices are added to buckets.
+        """
+        labels, gains = self.__labels, self.__gains
+        old_label = labels[v]
+        labels[v] = 1 - old_label
+        self.__part_weights[old_label] -= self.__vertex_weights[v]
+        self.__part_weights[1 - old_label] += self.__vertex_weights[v]
+        self.__cut -= gains[v]
+        gains[v] = -gains[v]
+        for nb, weight in zip(self.__adjacency[v], self.__edge_weights[v]):
+            delta = 2 * weight if labels[nb] == old_label else -2 * weight
+            gains[nb] += delta
+            if buckets is None or self.__locked[nb]:
+                continue
+            if nb in buckets[labels[nb]]:
+                buckets[labels[nb]].update(nb, delta)
+            elif delta > 0:
+                buckets[labels[nb]].insert(nb, gains[nb])
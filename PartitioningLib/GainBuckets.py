@@ -0,0 +1,70 @@
+class GainBuckets(object):
+    """
+    Bucket priority structure of vertices keyed by integer gain.
+    Insert, remove and update are O(1), max is found in O(1) unless the highest bucket
+    got empty, then it's searched among non-empty buckets.
+    """
+
+    def __init__(self):
+        self.__buckets = {}
+        self.__gains = {}
+        self.__max = None
+
+    def __len__(self):
+        return len(self.__gains)
+
+    def __contains__(self, v):
+        return v in self.__gains
+
+    def insert(self, v, gain):
+        assert v not in self.__gains, "Vertex already in buckets"
+        self.__gains[v] = gain
+        bucket = self.__buckets.get(gain)
+        if bucket is None:
+            bucket = self.__buckets[gain] = {}
+        bucket[v] = None
+        if self.__max is None or gain > self.__max:
+            self.__max = gain
+
+    def remove(self, v):
+        gain = self.__gains.pop(v)
+        bucket = self.__buckets[gain]
+        del bucket[v]
+        if not bucket:
+            del self.__buckets[gain]
+            if gain == self.__max:
+                self.__max = max(self.__buckets) if self.__buckets else None
+        return gain
+
+    def update(self, v, delta):
+        """
+        Method changes gain of v by delta.
+        :param v:
+        :param delta:
+        :return:
+        """
+        self.insert(v, self.remove(v) + delta)
+
+    def get_gain(self, v):
+        return self.__gains[v]
+
+    def get_max_gain(self):
+        return self.__max
+
+    def peek(self):
+        """
+        Method returns the most recently inserted vertex with the highest gain.
+        :return: vertex or None if buckets are empty
+        """
+        if self.__max is None:
+            return None
+        return next(reversed(self.__buckets[self.__max]))
+
+    def iterate(self):
+        """
+        Method yields (vertex, gain) pairs starting from the highest gain.
+        Buckets must not be modified during iteration.
+        """
+        for gain in sorted(self.__buckets, reverse=True):
+            for v in reversed(self.__buckets[gain]):
+                yield v, gain
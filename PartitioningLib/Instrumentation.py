@@ -0,0 +1,92 @@
+import time
+
+# counters reported for every run
+SXY_EVALUATIONS = "sxy_evaluations"
+SWAPS = "swaps"
+MOVES = "moves"
+PASSES = "passes"
+CALC_COST_CALLS = "calc_cost_calls"
+NEIGHBOUR_SCANS = "neighbour_scans"
+# nodes of branch and bound search and lower bounds computed in them
+SEARCH_NODES = "search_nodes"
+BOUND_EVALUATIONS = "bound_evaluations"
+COUNTERS = (SXY_EVALUATIONS, SWAPS, MOVES, PASSES, CALC_COST_CALLS, NEIGHBOUR_SCANS, SEARCH_NODES,
+            BOUND_EVALUATIONS)
+
+# events callbacks can be registered for
+PASS_EVENT = "pass"
+RUN_EVENT = "run"
+
+
+class Instrumentation(object):
+    """
+    Opt-in collector of algorithm statistics.
+    Partitioning and refinement engines report counters and passes only when they were given
+    an Instrumentation object, otherwise the only cost is a None check outside of inner loops.
+    Runs can be nested (lpa runs kla, ikla runs many kla), counters of a nested run
+    are added to the enclosing run when it ends.
+    """
+
+    def __init__(self):
+        self.__runs = []
+        self.__active = []
+        self.__callbacks = {PASS_EVENT: [], RUN_EVENT: []}
+
+    def register(self, event, callback):
+        """
+        Method registers callback called with pass or run record dict.
+        :param event: PASS_EVENT or RUN_EVENT
+        :param callback:
+        :return:
+        """
+        assert event in self.__callbacks, "Unknown event {}".format(event)
+        self.__callbacks[event].append(callback)
+
+    def start_run(self, method, n, m):
+        now = time.perf_counter()
+        self.__active.append({"method": method, "n": n, "m": m, "depth": len(self.__active),
+                              "counters": dict.fromkeys(COUNTERS, 0), "passes": [],
+                              "start": now, "last_pass": now})
+
+    def end_run(self, cut):
+        run = self.__active.pop()
+        run["time"] = time.perf_counter() - run.pop("start")
+        del run["last_pass"]
+        run["cut"] = cut
+        if self.__active:
+            parent = self.__active[-1]["counters"]
+            for name, value in run["counters"].items():
+                parent[name] += value
+        self.__runs.append(run)
+        for callback in self.__callbacks[RUN_EVENT]:
+            callback(run)
+
+    def count(self, name, value=1):
+        if self.__active:
+            self.__active[-1]["counters"][name] += value
+
+    def record_pass(self, cut):
+        """
+        Method records pass of the current run, its wall time is measured from the previous pass or run start.
+        :param cut: cut size after the pass
+        :return:
+        """
+        if not self.__active:
+            return
+        run = self.__active[-1]
+        now = time.perf_counter()
+        record = {"method": run["method"], "pass": len(run["passes"]), "time": now - run["last_pass"], "cut": cut}
+        run["last_pass"] = now
+        run["passes"].append(record)
+        run["counters"][PASSES] += 1
+        for callback in self.__callbacks[PASS_EVENT]:
+            callback(record)
+
+    def report(self):
+        """
+        :return: list of finished runs in order of finishing, nested runs before enclosing ones
+        """
+        return list(self.__runs)
+
+    def clear(self):
+        self.__runs = []
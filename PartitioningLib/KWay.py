@@ -0,0 +1,203 @@
+from PartitioningLib.KernighanLin import KernighanLin
+from PartitioningLib.FiducciaMattheyses import FiducciaMattheyses
+from PartitioningLib.Multilevel import Multilevel
+from PartitioningLib.Instrumentation import MOVES
+
+BISECTION_METHODS = ("kla", "fm", "multilevel")
+
+
+class RecursiveBisection(object):
+    """
+    K-way partitioning by recursive bisection.
+    Parts are split into two groups, vertices are bisected with targets equal to groups total sizes,
+    then both halves are partitioned recursively. Every bisection is rebalanced to exact targets.
+    """
+
+    def __init__(self, adjacency, targets, method, rng, instrumentation=None, budget=None):
+        """
+        :param adjacency: list of neighbours indices lists
+        :param targets: numbers of vertices in every part
+        :param method: bisection method, one of BISECTION_METHODS
+        :param rng: random numbers generator
+        :param instrumentation: Instrumentation passed to bisection engines, None disables it
+        :param budget: Budget passed to bisection engines, bisections are only rebalanced when it runs out
+        """
+        assert method in BISECTION_METHODS, "Unknown bisection method {}".format(method)
+        assert sum(targets) == len(adjacency), "Targets don't sum to number of vertices"
+        self.__adjacency = adjacency
+        self.__targets = targets
+        self.__method = method
+        self.__rng = rng
+        self.__instrumentation = instrumentation
+        self.__budget = budget
+
+    def run(self):
+        """
+        :return: list of part numbers indexed by vertex index
+        """
+        labels = [0] * len(self.__adjacency)
+        self.__partition(list(range(len(self.__adjacency))), 0, len(self.__targets), labels)
+        return labels
+
+    def __partition(self, vertices, first_part, end_part, labels):
+        if end_part - first_part == 1:
+            for v in vertices:
+                labels[v] = first_part
+            return
+        middle = (first_part + end_part) // 2
+        target = sum(self.__targets[first_part:middle])
+        sides = self.__bisect(vertices, target)
+        self.__partition([v for v, side in zip(vertices, sides) if side == 0], first_part, middle, labels)
+        self.__partition([v for v, side in zip(vertices, sides) if side == 1], middle, end_part, labels)
+
+    def __bisect(self, vertices, target):
+        """
+        Method bisects subgraph induced by vertices.
+        :param vertices: list of vertices indices
+        :param target: number of vertices in side 0
+        :return: list of 0/1 sides parallel to vertices
+        """
+        if target == 0 or target == len(vertices):
+            return [0 if target else 1] * len(vertices)
+        index = {v: i for i, v in enumerate(vertices)}
+        adjacency = [[index[nb] for nb in self.__adjacency[v] if nb in index] for v in vertices]
+        targets = [target, len(vertices) - target]
+        if self.__method == "multilevel":
+            sides, _ = Multilevel(adjacency, targets, 1, rng=self.__rng, instrumentation=self.__instrumentation,
+                                  budget=self.__budget).run()
+        else:
+            sides = [0] * target + [1] * targets[1]
+            self.__rng.shuffle(sides)
+            if self.__method == "kla":
+                KernighanLin(adjacency, sides, self.__instrumentation, self.__budget).run()
+            else:
+                FiducciaMattheyses(adjacency, sides, targets, 1, instrumentation=self.__instrumentation,
+                                   budget=self.__budget).run()
+        self.__rebalance(adjacency, sides, target)
+        return sides
+
+    @staticmethod
+    def __rebalance(adjacency, sides, target):
+        """
+        Method moves vertices with the highest gains from the bigger side until side 0 has exactly target vertices.
+        Refinements leave at most a few vertices of imbalance, so gains are computed on demand.
+        """
+        count = sides.count(0)
+        while count != target:
+            side = 0 if count > target else 1
+            best, best_gain = None, None
+            for v, v_side in enumerate(sides):
+                if v_side != side:
+                    continue
+                gain = sum(1 if sides[nb] != side else -1 for nb in adjacency[v])
+                if best is None or gain > best_gain:
+                    best, best_gain = v, gain
+            sides[best] = 1 - side
+            count += -1 if side == 0 else 1
+
+
+class KWayRefinement(object):
+    """
+    Greedy k-way refinement.
+    For every vertex keeps connectivity table: number of its neighbours in every part.
+    Boundary vertices are visited in random order and moved to the part with the highest positive gain
+    as long as parts sizes stay within tolerance. After a move only neighbours' tables change.
+    """
+
+    def __init__(self, adjacency, labels, targets, tolerance, rng, instrumentation=None, budget=None):
+        """
+        :param adjacency: list of neighbours indices lists
+        :param labels: list of part numbers, modified in place
+        :param targets: numbers of vertices in every part
+        :param tolerance: allowed difference between part size and its target
+        :param rng: random numbers generator
+        :param instrumentation: Instrumentation receiving counters and passes, None disables it
+        :param budget: Budget spent on visited vertices, refinement stops when it runs out
+        """
+        self.__adjacency = adjacency
+        self.__labels = labels
+        self.__targets = targets
+        self.__tolerance = tolerance
+        self.__rng = rng
+        self.__instrumentation = instrumentation
+        self.__budget = budget
+        self.__sizes = [0] * len(targets)
+        for label in labels:
+            self.__sizes[label] += 1
+        self.__connectivity = []
+        cut = 0
+        for v, row in enumerate(adjacency):
+            table = {}
+            for nb in row:
+                table[labels[nb]] = table.get(labels[nb], 0) + 1
+            self.__connectivity.append(table)
+            cut += len(row) - table.get(labels[v], 0)
+        self.__cut = cut // 2
+
+    def get_cut(self):
+        return self.__cut
+
+    def run(self):
+        """
+        Method runs passes until no vertex is moved or budget is exhausted.
+        :return: cut size
+        """
+        while self.run_pass() and (self.__budget is None or not self.__budget.is_exhausted()):
+            pass
+        return self.__cut
+
+    def run_pass(self):
+        """
+        :return: number of moved vertices
+        """
+        labels = self.__labels
+        boundary = [v for v, table in enumerate(self.__connectivity)
+                    if len(table) > 1 or (table and labels[v] not in table)]
+        self.__rng.shuffle(boundary)
+        moved = 0
+        for v in boundary:
+            if self.__budget is not None:
+                if self.__budget.is_exhausted():
+                    break
+                self.__budget.spend()
+            part = self.__best_part(v)
+            if part is not None:
+                self.__move(v, part)
+                moved += 1
+        if self.__instrumentation is not None:
+            self.__instrumentation.count(MOVES, moved)
+            self.__instrumentation.record_pass(self.__cut)
+        return moved
+
+    def __best_part(self, v):
+        """
+        Method finds part with the highest positive gain which can take v without breaking balance.
+        :return: part number or None
+        """
+        current = self.__labels[v]
+        if self.__sizes[current] - 1 < self.__targets[current] - self.__tolerance:
+            return None
+        table = self.__connectivity[v]
+        internal = table.get(current, 0)
+        best, best_gain = None, 0
+        for part, count in table.items():
+            if part == current or count - internal <= best_gain:
+                continue
+            if self.__sizes[part] + 1 > self.__targets[part] + self.__tolerance:
+                continue
+            best, best_gain = part, count - internal
+        return best
+
+    def __move(self, v, part):
+        current = self.__labels[v]
+        table = self.__connectivity[v]
+        self.__cut -= table.get(part, 0) - table.get(current, 0)
+        self.__labels[v] = part
+        self.__sizes[current] -= 1
+        self.__sizes[part] += 1
+        for nb in self.__adjacency[v]:
+            nb_table = self.__connectivity[nb]
+            nb_table[current] -= 1
+            if not nb_table[current]:
+                del nb_table[current]
+            nb_table[part] = nb_table.get(part, 0) + 1
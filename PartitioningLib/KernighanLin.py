@@ -0,0 +1,187 @@
+from PartitioningLib.Instrumentation import SXY_EVALUATIONS, SWAPS, NEIGHBOUR_SCANS
+
+
+class KernighanLin(object):
+    """
+    Kernighan-Lin bisection refinement working on vertex indices.
+    Keeps D-values (external minus internal degree) of every vertex and after each swap
+    updates only neighbours of swapped vertices. D-values are kept in buckets, so best pair
+    is found by scanning buckets from the highest values and stopping as soon as
+    no remaining pair can beat the best one found.
+    """
+
+    def __init__(self, adjacency, labels, instrumentation=None, budget=None):
+        """
+        :param adjacency: list of neighbours indices lists
+        :param labels: list of 0/1 partition labels, modified in place
+        :param instrumentation: Instrumentation receiving counters and passes, None disables it
+        :param budget: Budget spent on pair evaluations, pass stops at the best prefix when it runs out
+        """
+        self.__adjacency = adjacency
+        self.__instrumentation = instrumentation
+        self.__budget = budget
+        self.__neighbours = [set(row) for row in adjacency]
+        self.__labels = labels
+        self.__d = [0] * len(adjacency)
+        self.__cut = self.__calculate_d()
+        if instrumentation is not None:
+            instrumentation.count(NEIGHBOUR_SCANS, len(adjacency))
+
+    def __calculate_d(self):
+        """
+        Method calculates D-values of all vertices.
+        :return: cut size of current partition
+        """
+        cut = 0
+        labels = self.__labels
+        for v, row in enumerate(self.__adjacency):
+            external = 0
+            for nb in row:
+                if labels[nb] != labels[v]:
+                    external += 1
+            self.__d[v] = 2 * external - len(row)
+            if labels[v] == 0:
+                cut += external
+        return cut
+
+    def get_cut(self):
+        return self.__cut
+
+    def run(self):
+        """
+        Method runs passes until a pass doesn't decrease the cut or budget is exhausted.
+        :return: cut size
+        """
+        while self.run_pass() > 0 and (self.__budget is None or not self.__budget.is_exhausted()):
+            pass
+        return self.__cut
+
+    def run_pass(self):
+        """
+        Method performs one pass of swaps, then rolls back to the best prefix.
+        :return: gain of the pass
+        """
+        labels, d = self.__labels, self.__d
+        buckets = [{}, {}]
+        for v, label in enumerate(labels):
+            buckets[label].setdefault(d[v], set()).add(v)
+        swaps = []
+        gain_sum, best_gain, best_swaps = 0, 0, 0
+        evaluations = 0
+        steps = min(labels.count(0), labels.count(1))
+        for _ in range(steps):
+            if self.__budget is not None and self.__budget.is_exhausted():
+                break
+            x, y, gain, pair_evaluations = self.__find_best_pair(buckets[0], buckets[1])
+            evaluations += pair_evaluations
+            if self.__budget is not None:
+                self.__budget.spend(pair_evaluations)
+            self.__remove(buckets[0], x)
+            self.__remove(buckets[1], y)
+            self.__move(x, buckets)
+            self.__move(y, buckets)
+            swaps.append((x, y))
+            gain_sum += gain
+            if gain_sum > best_gain:
+                best_gain, best_swaps = gain_sum, len(swaps)
+        for x, y in reversed(swaps[best_swaps:]):
+            self.__move(y, None)
+            self.__move(x, None)
+        self.__cut -= best_gain
+        if self.__instrumentation is not None:
+            self.__instrumentation.count(SXY_EVALUATIONS, evaluations)
+            self.__instrumentation.count(SWAPS, len(swaps))
+            self.__instrumentation.count(NEIGHBOUR_SCANS, 2 * (len(swaps) + len(swaps) - best_swaps))
+            self.__instrumentation.record_pass(self.__cut)
+        return best_gain
+
+    def descend(self):
+        """
+        Method swaps the best pair as long as it decreases the cut, without locking vertices.
+        Buckets are built once and after a swap only swapped vertices and their neighbours change buckets,
+        so it stops in the same local optimum condition as greedy search over all pairs: no pair has S(x, y) > 0.
+        :return: cut size
+        """
+        labels, d = self.__labels, self.__d
+        buckets = [{}, {}]
+        for v, label in enumerate(labels):
+            buckets[label].setdefault(d[v], set()).add(v)
+        evaluations, swaps = 0, 0
+        while buckets[0] and buckets[1]:
+            if self.__budget is not None and self.__budget.is_exhausted():
+                break
+            x, y, gain, pair_evaluations = self.__find_best_pair(buckets[0], buckets[1])
+            evaluations += pair_evaluations
+            if self.__budget is not None:
+                self.__budget.spend(pair_evaluations)
+            if gain <= 0:
+                break
+            self.__remove(buckets[0], x)
+            self.__remove(buckets[1], y)
+            self.__move(x, buckets)
+            self.__move(y, buckets)
+            buckets[1].setdefault(d[x], set()).add(x)
+            buckets[0].setdefault(d[y], set()).add(y)
+            self.__cut -= gain
+            swaps += 1
+            if self.__instrumentation is not None:
+                self.__instrumentation.record_pass(self.__cut)
+        if self.__instrumentation is not None:
+            self.__instrumentation.count(SXY_EVALUATIONS, evaluations)
+            self.__instrumentation.count(SWAPS, swaps)
+            self.__instrumentation.count(NEIGHBOUR_SCANS, 2 * swaps)
+        return self.__cut
+
+    def __find_best_pair(self, x_buckets, y_buckets):
+        """
+        Method finds pair (x, y) with maximal S(x, y) = D(x) + D(y) - 2 * omega(x, y).
+        :return: x, y, S(x, y), number of evaluated pairs
+        """
+        x_keys = sorted(x_buckets, reverse=True)
+        y_keys = sorted(y_buckets, reverse=True)
+        best = None
+        evaluations = 0
+        for dx in x_keys:
+            if best is not None and dx + y_keys[0] <= best[2]:
+                break
+            for dy in y_keys:
+                if best is not None and dx + dy <= best[2]:
+                    break
+                for x in x_buckets[dx]:
+                    neighbours = self.__neighbours[x]
+                    for y in y_buckets[dy]:
+                        evaluations += 1
+                        gain = dx + dy - 2 if y in neighbours else dx + dy
+                        if best is None or gain > best[2]:
+                            best = (x, y, gain)
+                            if gain == dx + dy:
+                                break
+                    if best[2] == dx + dy:
+                        break
+        return best + (evaluations,)
+
+    def __remove(self, buckets, v):
+        key = self.__d[v]
+        buckets[key].remove(v)
+        if not buckets[key]:
+            del buckets[key]
+
+    def __move(self, v, buckets):
+        """
+        Method moves v to the other partition and updates D-values of its neighbours.
+        Buckets are updated only for neighbours which are still in them.
+        """
+        labels, d = self.__labels, self.__d
+        old_label = labels[v]
+        labels[v] = 1 - old_label
+        d[v] = -d[v]
+        for nb in self.__adjacency[v]:
+            delta = 2 if labels[nb] == old_label else -2
+            if buckets is not None:
+                bucket = buckets[labels[nb]].get(d[nb])
+                if bucket is not None and nb in bucket:
+                    bucket.remove(nb)
+                    if not bucket:
+                        del buckets[labels[nb]][d[nb]]
+                    buckets[labels[nb]].setdefault(d[nb] + delta, set()).add(nb)
+            d[nb] += delta
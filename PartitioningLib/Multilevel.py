@@ -0,0 +1,234 @@
+import heapq
+import random
+from PartitioningLib.FiducciaMattheyses import FiducciaMattheyses
+
+# coarsening stops when graph has at most that many vertices
+DEFAULT_COARSEST_N = 100
+# coarsening stops when a level doesn't shrink graph at least by that ratio
+MIN_COARSENING_RATIO = 0.95
+# number of graph growing attempts on the coarsest graph
+INITIAL_TRIES = 8
+# limit of FM passes on each level
+REFINEMENT_PASSES = 8
+# FM pass on a level ends after that many moves without improvement
+MAX_IDLE_MOVES = 100
+
+
+class Level(object):
+    """
+    Weighted graph on one level of the hierarchy.
+    cmap maps vertices of this level to vertices of the next (coarser) level.
+    """
+
+    def __init__(self, adjacency, edge_weights, vertex_weights):
+        self.adjacency = adjacency
+        self.edge_weights = edge_weights
+        self.vertex_weights = vertex_weights
+        self.cmap = None
+
+    def get_n(self):
+        return len(self.adjacency)
+
+
+class Multilevel(object):
+    """
+    Multilevel bisection.
+    1. Graph is coarsened by heavy edge matching, matched vertices are merged and their weights summed.
+    2. The coarsest graph is bisected by graph growing, best of several tries refined with FM.
+    3. Bisection is projected back level by level and refined with FM on every level.
+    """
+
+    def __init__(self, adjacency, targets, tolerance, coarsest_n=DEFAULT_COARSEST_N, rng=random,
+                 instrumentation=None, budget=None):
+        """
+        :param adjacency: list of neighbours indices lists
+        :param targets: target numbers of vertices in both partitions
+        :param tolerance: allowed difference between partition 0 size and its target
+        :param coarsest_n: coarsening stops at graphs with at most that many vertices
+        :param rng: random numbers generator
+        :param instrumentation: Instrumentation passed to FM refinements, None disables it
+        :param budget: Budget passed to FM refinements, when it runs out bisection is only projected back
+        and rebalanced on the original graph
+        """
+        self.__targets = targets
+        self.__instrumentation = instrumentation
+        self.__budget = budget
+        self.__tolerance = tolerance
+        self.__coarsest_n = coarsest_n
+        self.__rng = rng
+        finest = Level(adjacency, [[1] * len(row) for row in adjacency], [1] * len(adjacency))
+        self.__levels = [finest]
+
+    def get_levels_number(self):
+        return len(self.__levels)
+
+    def run(self):
+        """
+        Method runs all three phases.
+        :return: list of 0/1 labels of vertices of the original graph, cut size
+        """
+        self.__coarsen()
+        labels = self.__initial_bisection(self.__levels[-1])
+        for level in reversed(self.__levels[:-1]):
+            labels = [labels[c] for c in level.cmap]
+            cut = self.__refine(level, labels)
+        if len(self.__levels) == 1:
+            cut = self.__refine(self.__levels[0], labels)
+        # coarse levels allow wider tolerance and refinement stopped by budget doesn't restore balance
+        cut -= self.__rebalance(self.__levels[0], labels)
+        return labels, cut
+
+    def __coarsen(self):
+        while self.__levels[-1].get_n() > self.__coarsest_n:
+            level = self.__levels[-1]
+            coarse = self.__contract(level, self.__match(level))
+            if coarse.get_n() > MIN_COARSENING_RATIO * level.get_n():
+                level.cmap = None
+                break
+            self.__levels.append(coarse)
+
+    def __match(self, level):
+        """
+        Method finds heavy edge matching, visiting vertices in random order.
+        Each unmatched vertex is matched with unmatched neighbour connected by the heaviest edge.
+        Merged vertex can't weigh more than a half of tolerance-extended target, so balance stays possible.
+        :return: list of matched vertex for every vertex, vertex itself if unmatched
+        """
+        n = level.get_n()
+        max_weight = max(1, (min(self.__targets) + self.__tolerance) // 2)
+        match = [-1] * n
+        order = list(range(n))
+        self.__rng.shuffle(order)
+        for v in order:
+            if match[v] != -1:
+                continue
+            best, best_weight = v, 0
+            for nb, weight in zip(level.adjacency[v], level.edge_weights[v]):
+                if match[nb] == -1 and nb != v and weight > best_weight \
+                        and level.vertex_weights[v] + level.vertex_weights[nb] <= max_weight:
+                    best, best_weight = nb, weight
+            match[v] = best
+            match[best] = v
+        return match
+
+    @staticmethod
+    def __contract(level, match):
+        """
+        Method merges matched vertices into a coarser level, parallel edges are merged with summed weights.
+        :return: coarse Level
+        """
+        cmap = [-1] * level.get_n()
+        coarse_n = 0
+        for v in range(level.get_n()):
+            if cmap[v] == -1:
+                cmap[v] = cmap[match[v]] = coarse_n
+                coarse_n += 1
+        level.cmap = cmap
+        vertex_weights = [0] * coarse_n
+        rows = [{} for _ in range(coarse_n)]
+        for v in range(level.get_n()):
+            c = cmap[v]
+            vertex_weights[c] += level.vertex_weights[v]
+            row = rows[c]
+            for nb, weight in zip(level.adjacency[v], level.edge_weights[v]):
+                cnb = cmap[nb]
+                if cnb != c:
+                    row[cnb] = row.get(cnb, 0) + weight
+        adjacency = [list(row.keys()) for row in rows]
+        edge_weights = [list(row.values()) for row in rows]
+        return Level(adjacency, edge_weights, vertex_weights)
+
+    def __tolerance_for(self, level):
+        # a coarse vertex has to be movable, tolerance is tightened back on finer levels
+        return max(self.__tolerance, max(level.vertex_weights, default=1))
+
+    def __refine(self, level, labels):
+        fm = FiducciaMattheyses(level.adjacency, labels, self.__targets, self.__tolerance_for(level),
+                                level.edge_weights, level.vertex_weights,
+                                boundary_only=True, max_idle_moves=MAX_IDLE_MOVES,
+                                instrumentation=self.__instrumentation, budget=self.__budget)
+        return fm.run(REFINEMENT_PASSES)
+
+    def __rebalance(self, level, labels):
+        """
+        Method moves vertices of the highest gain out of the heavier partition until weight of partition 0
+        is within tolerance from its target. It ignores budget, as the result must be a valid bisection.
+        :param level: level with unit vertex weights
+        :param labels: list of 0/1 labels, modified in place
+        :return: total gain of moves, decrease of the cut
+        """
+        weight = sum(w for w, label in zip(level.vertex_weights, labels) if label == 0)
+        excess = weight - self.__targets[0]
+        if abs(excess) <= self.__tolerance:
+            return 0
+        source = 0 if excess > 0 else 1
+        moves = abs(excess) - self.__tolerance
+        gains = [0] * level.get_n()
+        heap = []
+        for v, row in enumerate(level.adjacency):
+            for nb, edge_weight in zip(row, level.edge_weights[v]):
+                gains[v] += edge_weight if labels[nb] != labels[v] else -edge_weight
+            if labels[v] == source:
+                heap.append((-gains[v], v))
+        heapq.heapify(heap)
+        total = 0
+        while moves:
+            gain, v = heapq.heappop(heap)
+            # entries of moved vertices and outdated gains are skipped
+            if labels[v] != source or -gain != gains[v]:
+                continue
+            labels[v] = 1 - source
+            total += gains[v]
+            gains[v] = -gains[v]
+            moves -= level.vertex_weights[v]
+            for nb, edge_weight in zip(level.adjacency[v], level.edge_weights[v]):
+                gains[nb] += 2 * edge_weight if labels[nb] == source else -2 * edge_weight
+                if labels[nb] == source:
+                    heapq.heappush(heap, (-gains[nb], nb))
+        return total
+
+    def __grow(self, level):
+        """
+        Method grows partition 0 by BFS from random vertex until it reaches its target weight.
+        Other connected components are entered from random vertices.
+        :return: labels
+        """
+        n = level.get_n()
+        labels = [1] * n
+        weight = 0
+        order = list(range(n))
+        self.__rng.shuffle(order)
+        visited = [False] * n
+        queue, head = [], 0
+        for root in order:
+            if weight >= self.__targets[0]:
+                break
+            if visited[root]:
+                continue
+            visited[root] = True
+            queue.append(root)
+            while head < len(queue) and weight < self.__targets[0]:
+                v = queue[head]
+                head += 1
+                labels[v] = 0
+                weight += level.vertex_weights[v]
+                for nb in level.adjacency[v]:
+                    if not visited[nb]:
+                        visited[nb] = True
+                        queue.append(nb)
+        return labels
+
+    def __initial_bisection(self, level):
+        best_labels, best_state = None, None
+        tolerance = self.__tolerance_for(level)
+        for _ in range(INITIAL_TRIES):
+            if best_labels is not None and self.__budget is not None and self.__budget.is_exhausted():
+                break
+            labels = self.__grow(level)
+            cut = self.__refine(level, labels)
+            weight = sum(w for w, label in zip(level.vertex_weights, labels) if label == 0)
+            imbalance = abs(weight - self.__targets[0])
+            state = (max(0, imbalance - tolerance), cut, imbalance)
+            if best_state is None or state < best_state:
+                best_labels, best_state = labels, state
+        return best_labels
@@ -0,0 +1,74 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NUMPY_AVAILABLE = np is not None
+
+
+class NumpyKernels(object):
+    """
+    Vectorized cost and gain computations.
+    Adjacency is held as two arrays of edge endpoints (each edge in both directions),
+    partition is an array of labels indexed by vertex index.
+    """
+
+    def __init__(self, adjacency):
+        """
+        :param adjacency: list of neighbours indices lists
+        """
+        assert NUMPY_AVAILABLE, "NumPy is required for vectorized kernels"
+        self.__n = len(adjacency)
+        degrees = np.fromiter((len(row) for row in adjacency), dtype=np.int64, count=self.__n)
+        self.__sources = np.repeat(np.arange(self.__n, dtype=np.int64), degrees)
+        self.__targets = np.fromiter((nb for row in adjacency for nb in row), dtype=np.int64,
+                                     count=int(degrees.sum()))
+
+    def cut(self, labels):
+        """
+        Method calculates number of edges between partitions.
+        :param labels: array of partition labels
+        :return: cut size
+        """
+        labels = np.asarray(labels)
+        return int(np.count_nonzero(labels[self.__sources] != labels[self.__targets])) // 2
+
+    def d_values(self, labels):
+        """
+        Method calculates D-values (external minus internal degree) of all vertices.
+        :param labels: array of partition labels
+        :return: array of D-values
+        """
+        labels = np.asarray(labels)
+        signs = np.where(labels[self.__sources] != labels[self.__targets], 1, -1)
+        return np.bincount(self.__sources, weights=signs, minlength=self.__n).astype(np.int64)
+
+    def sxy_matrix(self, labels):
+        """
+        Method calculates S(x, y) = D(x) + D(y) - 2 * omega(x, y) for all x in partition 0 and y in partition 1.
+        :param labels: array of 0/1 partition labels
+        :return: indices of partition 0 vertices, indices of partition 1 vertices, |X| x |Y| matrix
+        """
+        labels = np.asarray(labels)
+        d = self.d_values(labels)
+        x = np.flatnonzero(labels == 0)
+        y = np.flatnonzero(labels == 1)
+        positions = np.empty(self.__n, dtype=np.int64)
+        positions[x] = np.arange(len(x))
+        positions[y] = np.arange(len(y))
+        crossing = (labels[self.__sources] == 0) & (labels[self.__targets] == 1)
+        omega = np.zeros((len(x), len(y)), dtype=np.int64)
+        omega[positions[self.__sources[crossing]], positions[self.__targets[crossing]]] = 1
+        return x, y, d[x][:, None] + d[y][None, :] - 2 * omega
+
+    def best_swap(self, labels):
+        """
+        Method finds pair with maximal S(x, y).
+        :param labels: array of 0/1 partition labels
+        :return: x, y, S(x, y) or None if one of partitions is empty
+        """
+        x, y, sxy = self.sxy_matrix(labels)
+        if sxy.size == 0:
+            return None
+        i, j = np.unravel_index(np.argmax(sxy), sxy.shape)
+        return int(x[i]), int(y[j]), int(sxy[i, j])
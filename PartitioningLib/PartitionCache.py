@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+from array import array
+
+CACHE_EXTENSION = ".json"
+DEFAULT_MAX_BYTES = 256 * 2 ** 20
+
+
+class PartitionCache(object):
+    """
+    Persistent cache of partitioning results, one JSON file per entry in a local directory.
+    Entries are keyed by a hash of the graph structure, the method, its parameters and everything else
+    the result depends on. Reading an entry refreshes its modification time, when files of the cache
+    exceed max_bytes the least recently used ones are removed.
+    Hits and misses are counted by every cache object.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        :param directory: directory of cache files, created if it doesn't exist
+        :param max_bytes: limit of total size of cache files
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.__directory = directory
+        self.__max_bytes = max_bytes
+        self.__stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    @staticmethod
+    def fingerprint(graph):
+        """
+        Method hashes structure of the graph: number of vertices and sorted neighbours of every vertex.
+        Vertices properties are not included.
+        :param graph: graph of any backend
+        :return: hex digest
+        """
+        digest = hashlib.sha256()
+        n = graph.get_n()
+        digest.update(n.to_bytes(8, "little"))
+        for i in range(n):
+            row = array('q', sorted(graph.get_neighbour_indices(i)))
+            digest.update(len(row).to_bytes(8, "little"))
+            digest.update(row.tobytes())
+        return digest.hexdigest()
+
+    @staticmethod
+    def key(**fields):
+        """
+        Method hashes JSON serializable fields into entry key.
+        :return: hex digest
+        """
+        return hashlib.sha256(json.dumps(fields, sort_keys=True).encode()).hexdigest()
+
+    def __path(self, key):
+        return os.path.join(self.__directory, key + CACHE_EXTENSION)
+
+    def get(self, key):
+        """
+        :param key:
+        :return: stored entry dict or None
+        """
+        path = self.__path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.__stats["misses"] += 1
+            return None
+        self.__stats["hits"] += 1
+        return entry
+
+    def put(self, key, entry):
+        """
+        Method stores JSON serializable entry and evicts the least recently used entries over size limit.
+        File is written under temporary name and renamed, so readers never see a partial entry.
+        :param key:
+        :param entry:
+        :return:
+        """
+        path = self.__path(key)
+        temporary = "{}.{}.tmp".format(path, os.getpid())
+        with open(temporary, "w") as f:
+            json.dump(entry, f)
+        os.replace(temporary, path)
+        self.__stats["stores"] += 1
+        self.__evict()
+
+    def __evict(self):
+        files = []
+        total = 0
+        for name in os.listdir(self.__directory):
+            if not name.endswith(CACHE_EXTENSION):
+                continue
+            try:
+                status = os.stat(os.path.join(self.__directory, name))
+            except OSError:
+                continue
+            files.append((status.st_mtime, status.st_size, name))
+            total += status.st_size
+        files.sort()
+        for _, size, name in files:
+            if total <= self.__max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.__directory, name))
+            except OSError:
+                continue
+            total -= size
+            self.__stats["evictions"] += 1
+
+    def get_stats(self):
+        """
+        :return: dict of hits, misses, stores and evictions counts
+        """
+        return dict(self.__stats)
+
+    def clear(self):
+        for name in os.listdir(self.__directory):
+            if name.endswith(CACHE_EXTENSION):
+                os.remove(os.path.join(self.__directory, name))
@@ -0,0 +1,161 @@
+from array import array
+from collections.abc import Set
+
+UNASSIGNED = -1
+
+
+class PartitionState(object):
+    """
+    Partition held as an array of part numbers indexed by vertex index, UNASSIGNED for vertices in no part.
+    Sizes of parts are maintained on every change, so membership, part of a vertex and part size are O(1).
+    Snapshot is a copy of the array, restoring it is a copy back.
+    """
+
+    def __init__(self, n, k):
+        """
+        :param n: number of vertices
+        :param k: number of parts
+        """
+        self.__labels = array('i', [UNASSIGNED]) * n
+        self.__sizes = [0] * k
+
+    def __len__(self):
+        return len(self.__labels)
+
+    def clear(self, n):
+        """
+        Method makes all of n vertices unassigned.
+        :param n: number of vertices
+        :return:
+        """
+        self.__labels = array('i', [UNASSIGNED]) * n
+        self.__sizes = [0] * len(self.__sizes)
+
+    def get(self, index):
+        """
+        :param index: vertex index
+        :return: part number or UNASSIGNED
+        """
+        return self.__labels[index]
+
+    def count(self, indices, part):
+        """
+        :param indices: iterable of vertices indices
+        :param part:
+        :return: number of vertices from indices which are in part
+        """
+        labels = self.__labels
+        return sum(1 for index in indices if labels[index] == part)
+
+    def get_size(self, part):
+        return self.__sizes[part]
+
+    def get_sizes(self):
+        return list(self.__sizes)
+
+    def assign(self, index, part):
+        """
+        Method moves vertex to part, part may be UNASSIGNED.
+        :param index: vertex index
+        :param part: part number
+        :return:
+        """
+        old = self.__labels[index]
+        if old != UNASSIGNED:
+            self.__sizes[old] -= 1
+        if part != UNASSIGNED:
+            self.__sizes[part] += 1
+        self.__labels[index] = part
+
+    def get_labels(self):
+        """
+        :return: list of part numbers indexed by vertex index, None for unassigned vertices
+        """
+        return [None if label == UNASSIGNED else label for label in self.__labels]
+
+    def get_array(self):
+        """
+        :return: array of part numbers indexed by vertex index, UNASSIGNED for unassigned vertices,
+        it is the state itself and must not be modified
+        """
+        return self.__labels
+
+    def set_labels(self, labels):
+        """
+        :param labels: sequence of part numbers indexed by vertex index, None or UNASSIGNED for unassigned vertices
+        :return:
+        """
+        assert len(labels) == len(self.__labels), "Wrong number of labels"
+        self.__labels = array('i', (UNASSIGNED if label is None else label for label in labels))
+        self.__sizes = [0] * len(self.__sizes)
+        for label in self.__labels:
+            if label != UNASSIGNED:
+                self.__sizes[label] += 1
+
+    def members(self, part):
+        """
+        :param part:
+        :return: list of indices of vertices in part
+        """
+        return [index for index, label in enumerate(self.__labels) if label == part]
+
+    def snapshot(self):
+        return array('i', self.__labels), list(self.__sizes)
+
+    def restore(self, snapshot):
+        labels, sizes = snapshot
+        self.__labels = array('i', labels)
+        self.__sizes = list(sizes)
+
+    def append(self):
+        """
+        Method adds unassigned vertex with the next index.
+        :return:
+        """
+        self.__labels.append(UNASSIGNED)
+
+    def delete(self, index):
+        """
+        Method removes vertex, indices of vertices after it decrease by one, the same way as in graphs.
+        :param index:
+        :return:
+        """
+        self.assign(index, UNASSIGNED)
+        del self.__labels[index]
+
+
+class PartitionSet(Set):
+    """
+    Live read-only set of vertices of one part of PartitionState.
+    Supports membership, iteration, len and set operators, which return plain sets.
+    """
+
+    def __init__(self, state, part, graph):
+        self.__state = state
+        self.__part = part
+        self.__graph = graph
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        return set(iterable)
+
+    def get_part(self):
+        return self.__part
+
+    def get_state(self):
+        return self.__state
+
+    def __contains__(self, vertex):
+        if not self.__graph.has_vertex(vertex):
+            return False
+        return self.__state.get(self.__graph.get_vertex_index(vertex)) == self.__part
+
+    def __iter__(self):
+        for index in self.__state.members(self.__part):
+            yield self.__graph.get_vertex(index)
+
+    def __len__(self):
+        return self.__state.get_size(self.__part)
+
+    def __repr__(self):
+        return "PartitionSet({})".format(set(self))
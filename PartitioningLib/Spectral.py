@@ -0,0 +1,94 @@
+import warnings
+
+try:
+    import numpy as np
+    from scipy.sparse import csr_matrix, diags
+    from scipy.sparse.linalg import lobpcg
+except ImportError:
+    np = None
+
+SCIPY_AVAILABLE = np is not None
+
+# graphs up to that many vertices are solved by dense eigendecomposition
+DENSE_N = 200
+LOBPCG_TOLERANCE = 1e-4
+LOBPCG_MAX_ITERATIONS = 500
+# LOBPCG runs in chunks of that many iterations, budget is checked between them
+LOBPCG_CHUNK_ITERATIONS = 25
+
+
+class Spectral(object):
+    """
+    Spectral partitioning by the Fiedler vector, eigenvector of the second smallest eigenvalue of the Laplacian.
+    The vector is computed by LOBPCG with the constant eigenvector given as a constraint and Jacobi preconditioner,
+    so only sparse matrix-vector products are needed. It runs in chunks of iterations, each one starting
+    from the vector of the previous one, and stops early when budget is exhausted.
+    Vertices ordered by their Fiedler vector values are cut into consecutive parts of target sizes,
+    for bisection it is the split at the weighted median.
+    """
+
+    def __init__(self, adjacency, rng, budget=None):
+        """
+        :param adjacency: list of neighbours indices lists
+        :param rng: random numbers generator, seeds the starting vector
+        :param budget: Budget spent on LOBPCG iterations, when it is exhausted the current approximation is used
+        """
+        self.__budget = budget
+        assert SCIPY_AVAILABLE, "NumPy and SciPy are required for spectral partitioning"
+        self.__n = len(adjacency)
+        self.__rng = rng
+        degrees = np.fromiter((len(row) for row in adjacency), dtype=np.int64, count=self.__n)
+        offsets = np.zeros(self.__n + 1, dtype=np.int64)
+        np.cumsum(degrees, out=offsets[1:])
+        targets = np.fromiter((nb for row in adjacency for nb in row), dtype=np.int64, count=int(offsets[-1]))
+        adjacency_matrix = csr_matrix((np.ones(len(targets)), targets, offsets), shape=(self.__n, self.__n))
+        self.__degrees = degrees.astype(np.float64)
+        self.__laplacian = (diags(self.__degrees) - adjacency_matrix).tocsr()
+
+    def fiedler(self):
+        """
+        :return: array of Fiedler vector values indexed by vertex index
+        """
+        n = self.__n
+        if n < 2:
+            # there is no second eigenvector, any order of vertices is the same
+            return np.zeros(n)
+        if n <= DENSE_N:
+            _, vectors = np.linalg.eigh(self.__laplacian.toarray())
+            return vectors[:, 1]
+        generator = np.random.default_rng(self.__rng.getrandbits(64))
+        vector = generator.standard_normal((n, 1))
+        constant = np.ones((n, 1)) / np.sqrt(n)
+        preconditioner = diags(1.0 / np.maximum(self.__degrees, 1.0))
+        iterations = 0
+        while iterations < LOBPCG_MAX_ITERATIONS:
+            chunk = min(LOBPCG_CHUNK_ITERATIONS, LOBPCG_MAX_ITERATIONS - iterations)
+            # only the order of values matters, so a vector which didn't reach tolerance is still used
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", UserWarning)
+                values, vector = lobpcg(self.__laplacian, vector, M=preconditioner, Y=constant,
+                                        tol=LOBPCG_TOLERANCE, maxiter=chunk, largest=False)
+            iterations += chunk
+            if self.__budget is not None:
+                self.__budget.spend(chunk)
+                if self.__budget.is_exhausted():
+                    break
+            residual = self.__laplacian @ vector - values[0] * vector
+            if np.linalg.norm(residual) <= LOBPCG_TOLERANCE:
+                break
+        return vector[:, 0]
+
+    def run(self, targets):
+        """
+        :param targets: numbers of vertices in every part
+        :return: list of part numbers indexed by vertex index
+        """
+        assert sum(targets) == self.__n, "Targets don't sum to number of vertices"
+        order = np.argsort(self.fiedler(), kind="stable")
+        labels = [0] * self.__n
+        start = 0
+        for part, target in enumerate(targets):
+            for v in order[start:start + target].tolist():
+                labels[v] = part
+            start += target
+        return labels
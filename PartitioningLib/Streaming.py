@@ -0,0 +1,87 @@
+from array import array
+
+STREAMING_METHODS = ("ldg", "fennel")
+# exponent of Fennel's load penalty, 1.5 is used in the paper
+FENNEL_GAMMA = 1.5
+
+
+class Streaming(object):
+    """
+    One-pass streaming partitioning: vertices arrive with their neighbours and each one is assigned
+    immediately to a part chosen from its already assigned neighbours and parts loads.
+    Parts never exceed target + tolerance, and once the vertices still to come are just enough to fill
+    parts up to target - tolerance, they are only assigned to parts below that.
+    LDG scores part i by neighbours in i times (1 - size / capacity),
+    Fennel by neighbours in i minus alpha * gamma * load ^ (gamma - 1).
+    Only labels and parts sizes are kept, O(n) memory. Running another pass over the stream restreams:
+    every vertex is taken out of its part and assigned again knowing labels of all its neighbours.
+    """
+
+    def __init__(self, n, m, targets, tolerance, method="fennel", rng=None):
+        """
+        :param n: number of vertices
+        :param m: number of edges, used by Fennel's penalty
+        :param targets: numbers of vertices in every part
+        :param tolerance: allowed difference between part size and its target
+        :param method: one of STREAMING_METHODS
+        :param rng: random numbers generator breaking ties, ties go to the least loaded part if None
+        """
+        assert method in STREAMING_METHODS, "Unknown streaming method {}".format(method)
+        assert sum(targets) == n, "Targets don't sum to number of vertices"
+        self.__capacities = [target + tolerance for target in targets]
+        self.__minimums = [max(0, target - tolerance) for target in targets]
+        self.__assigned = 0
+        self.__method = method
+        self.__rng = rng
+        self.__labels = array('i', [-1]) * n
+        self.__sizes = [0] * len(targets)
+        k = len(targets)
+        self.__alpha = m * k ** (FENNEL_GAMMA - 1) / n ** FENNEL_GAMMA if n else 0
+        # Fennel's load is scaled, so that for unequal targets every part is penalized relative to its own target
+        self.__scales = [n / (k * target) if target else 0 for target in targets]
+
+    def get_labels(self):
+        return self.__labels
+
+    def run(self, stream):
+        """
+        Method makes one pass over the stream.
+        :param stream: iterable of (vertex index, neighbours indices) pairs, every vertex exactly once
+        :return: array of part numbers indexed by vertex index
+        """
+        labels, sizes = self.__labels, self.__sizes
+        n = len(labels)
+        for v, neighbours in stream:
+            if labels[v] >= 0:
+                sizes[labels[v]] -= 1
+                self.__assigned -= 1
+            deficit = sum(max(0, minimum - size) for minimum, size in zip(self.__minimums, sizes))
+            part = self.__choose(neighbours, deficit >= n - self.__assigned)
+            labels[v] = part
+            sizes[part] += 1
+            self.__assigned += 1
+        return labels
+
+    def __choose(self, neighbours, fill):
+        """
+        :param fill: only parts smaller than their minimum may be chosen
+        :return: part number
+        """
+        labels, sizes = self.__labels, self.__sizes
+        counts = [0] * len(sizes)
+        for nb in neighbours:
+            if labels[nb] >= 0:
+                counts[labels[nb]] += 1
+        best, best_key = None, None
+        for part, count in enumerate(counts):
+            if sizes[part] >= self.__capacities[part] or fill and sizes[part] >= self.__minimums[part]:
+                continue
+            if self.__method == "ldg":
+                score = count * (1 - sizes[part] / self.__capacities[part])
+            else:
+                score = count - self.__alpha * FENNEL_GAMMA * (sizes[part] * self.__scales[part]) ** (FENNEL_GAMMA - 1)
+            tie = self.__rng.random() if self.__rng is not None else 0
+            key = (score, -sizes[part] / self.__capacities[part], tie)
+            if best is None or key > best_key:
+                best, best_key = part, key
+        return best
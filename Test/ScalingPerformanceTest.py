@@ -0,0 +1,164 @@
+from GraphLib.GraphGenerator import *
+from GraphLib.SparseGraph import SparseGraph
+from Partitioning import *
+from Test import Test
+from statistics import mean, median, stdev
+
+import argparse
+import json
+import math
+import sys
+import time
+import tracemalloc
+
+DEFAULT_SIZES = (100, 200, 400)
+# average vertex degrees
+DEFAULT_DENSITIES = (4, 8)
+DEFAULT_FAMILIES = ("gnm", "gnp", "triangularization")
+DEFAULT_GRAPHS_NUMBER = 3
+DEFAULT_REPEATS = 3
+DEFAULT_WARMUP = 1
+# slowdown ratio of median time flagged as regression
+DEFAULT_THRESHOLD = 1.2
+
+
+class ScalingPerformanceTest(Test):
+    """
+    Sweeps graph families, sizes and densities, times every bisection method with perf_counter after
+    warmup runs and records peak memory of a separate traced run. Results are written to JSON and compared
+    with a baseline JSON from a previous run, slowdowns over threshold are flagged as regressions.
+    Triangularization has no density, its size is the closest square not smaller than n.
+    """
+
+    def __init__(self, bisection_methods=None, sizes=DEFAULT_SIZES, densities=DEFAULT_DENSITIES,
+                 families=DEFAULT_FAMILIES, graphs_number=DEFAULT_GRAPHS_NUMBER, repeats=DEFAULT_REPEATS,
+                 warmup=DEFAULT_WARMUP, seed=0, graph_class=SparseGraph, output=None, baseline=None,
+                 threshold=DEFAULT_THRESHOLD):
+        super().__init__()
+        if bisection_methods is None:
+            self.fail("No bisection methods provided")
+        self.bisection_methods = bisection_methods
+        self.sizes = sizes
+        self.densities = densities
+        self.families = families
+        self.graphs_number = graphs_number
+        self.repeats = repeats
+        self.warmup = warmup
+        self.seed = seed
+        self.graph_class = graph_class
+        self.output = output
+        self.baseline = baseline
+        self.threshold = threshold
+        self.cells = None
+        self.records = []
+        self.regressions = []
+
+    def __generate(self, family, n, density, seed):
+        if family == "gnm":
+            m = max(n - 1, min(n * (n - 1) // 2, density * n // 2))
+            return GraphGenerator.generate(n, m, graph_class=self.graph_class, seed=seed)
+        if family == "gnp":
+            return GraphGenerator.generate_gnp(n, min(1, density / (n - 1)), graph_class=self.graph_class, seed=seed)
+        if family == "triangularization":
+            return GraphGenerator.generate_triangularization(math.isqrt(n - 1) + 1, graph_class=self.graph_class)
+        self.fail("Unknown graph family {}".format(family))
+
+    def set_up(self):
+        self.cells = []
+        self.records = []
+        self.regressions = []
+        seed = self.seed
+        for family in self.families:
+            densities = (None,) if family == "triangularization" else self.densities
+            for density in densities:
+                for n in self.sizes:
+                    graphs = []
+                    for _ in range(self.graphs_number):
+                        graphs.append(self.__generate(family, n, density, seed))
+                        seed += 1
+                    self.cells.append((family, n, density, graphs))
+
+    def tear_down(self):
+        print("\n============================")
+        for record in self.records:
+            print("{family:>18} n={n:<7} density={density!s:<5} {method:<12} median {time_median:.6f}s "
+                  "min {time_min:.6f}s peak {peak_memory}B cost {cost_mean}".format(**record))
+        for regression in self.regressions:
+            print("REGRESSION {family} n={n} density={density} {method}: {time_median:.6f}s vs baseline "
+                  "{baseline_median:.6f}s ({ratio:.2f}x)".format(**regression))
+        print("============================")
+        if self.output is not None:
+            with open(self.output, "w") as f:
+                json.dump({"threshold": self.threshold, "results": self.records,
+                           "regressions": self.regressions}, f, indent=2)
+
+    @staticmethod
+    def __key(record):
+        return record["family"], record["n"], record["density"], record["method"]
+
+    def __measure(self, method, family, n, density, graphs):
+        times, costs, peak = [], [], 0
+        for graph_number, graph in enumerate(graphs):
+            for repeat in range(self.warmup + self.repeats):
+                bis = Partitioning(graph, seed=graph_number)
+                before = time.perf_counter()
+                getattr(bis, method.__name__)()
+                after = time.perf_counter()
+                if repeat >= self.warmup:
+                    times.append(after - before)
+            costs.append(bis.calc_cost())
+            tracemalloc.start()
+            getattr(Partitioning(graph, seed=graph_number), method.__name__)()
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        return {"family": family, "n": n, "density": density, "method": method.__name__,
+                "time_mean": mean(times), "time_median": median(times), "time_min": min(times),
+                "time_stdev": stdev(times) if len(times) > 1 else 0.0,
+                "peak_memory": peak, "cost_mean": mean(costs)}
+
+    def __compare(self):
+        with open(self.baseline) as f:
+            baseline = {self.__key(record): record for record in json.load(f)["results"]}
+        for record in self.records:
+            old = baseline.get(self.__key(record))
+            if old is None:
+                continue
+            ratio = record["time_median"] / old["time_median"]
+            if ratio > self.threshold:
+                regression = dict(record, baseline_median=old["time_median"], ratio=ratio)
+                self.regressions.append(regression)
+
+    def test_scaling_performance(self):
+        for method in self.bisection_methods:
+            for family, n, density, graphs in self.cells:
+                self.records.append(self.__measure(method, family, n, density, graphs))
+        if self.baseline is not None:
+            self.__compare()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time bisection methods on graph families of growing sizes, "
+                                                 "optionally comparing with a baseline JSON of a previous run")
+    parser.add_argument("--methods", nargs="+", default=["kla", "fm", "multilevel"], choices=METHODS)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--densities", type=int, nargs="+", default=list(DEFAULT_DENSITIES),
+                        help="average vertex degrees")
+    parser.add_argument("--families", nargs="+", default=list(DEFAULT_FAMILIES), choices=DEFAULT_FAMILIES)
+    parser.add_argument("--graphs", type=int, default=DEFAULT_GRAPHS_NUMBER, help="graphs of every cell")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="JSON file results are written to")
+    parser.add_argument("--baseline", default=None, help="JSON file of a previous run to compare with")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="slowdown ratio of median time flagged as regression")
+    args = parser.parse_args(argv)
+    test = ScalingPerformanceTest([getattr(Partitioning, method) for method in args.methods], args.sizes,
+                                  args.densities, args.families, args.graphs, args.repeats, args.warmup, args.seed,
+                                  output=args.output, baseline=args.baseline, threshold=args.threshold)
+    test.run()
+    return 1 if test.regressions or any(result != "PASSED" for result in test.results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
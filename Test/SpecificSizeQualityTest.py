@@ -1,46 +1,167 @@
 from GraphLib.GraphGenerator import *
+from GraphLib.GraphIO import GraphIO, BINARY_EXTENSION
+from GraphLib.SparseGraph import SparseGraph
 from Partitioning import *
 from Test import Test
-from statistics import mean, stdev
+from statistics import mean, median, stdev
+
+import multiprocessing
+import os
+import time
 
 DEFAULT_GRAPHS_NUMBER = 100
 
+# graphs shared with worker processes, each worker receives them once when it starts
+_worker_graphs = None
+
+
+def _init_quality_worker(graphs):
+    global _worker_graphs
+    _worker_graphs = graphs
+
+
+def _quality_graph(task):
+    """
+    Method generates G(n, m) graph, or loads it from cache file if it exists, and writes new graphs to cache.
+    Edges are read back from CSR rows, so a generated graph and a cached one give the same edges in the same order.
+    :param task: (n, m, seed, path), path is None without cache
+    :return: list of (index, index) pairs
+    """
+    n, m, seed, path = task
+    if path is not None and os.path.exists(path):
+        graph = GraphIO.load_binary(path)
+    else:
+        graph = GraphGenerator.generate(n, m, graph_class=SparseGraph, seed=seed)
+        if path is not None:
+            # written under temporary name and renamed, so a parallel run never reads a partial file
+            temporary = "{}.{}.tmp".format(path, os.getpid())
+            GraphIO.write_binary(graph, temporary)
+            os.replace(temporary, path)
+    return [(i, j) for i in range(n) for j in graph.get_neighbour_indices(i) if i < j]
+
+
+def _quality_cell(task):
+    """
+    Method runs one method on one graph of the set.
+    :param task: (method name, graph number, seed)
+    :return: (method name, graph number, cost, time in seconds)
+    """
+    method, graph_number, seed = task
+    bis = Partitioning(_worker_graphs[graph_number], seed=seed)
+    before = time.perf_counter()
+    getattr(bis, method)()
+    after = time.perf_counter()
+    return method, graph_number, bis.calc_cost(), after - before
+
 
 class SpecificSizeQualityTest(Test):
+    """
+    Runs every bisection method on the same set of random graphs with n vertices and reports distributions
+    of cut costs and times of every method.
+    Graph number i is generated with seed + i and partitioned with the same seed by every method, so results
+    are reproducible. With exact the optimal cut of every graph is computed too and gaps of methods to it
+    are reported. Generation and (method, graph) cells run in a pool of worker processes, generated graphs
+    are kept in cache_dir as binary files and reused by later runs.
+    """
 
-    def __init__(self, size_n=10, bisection_methods=None, graphs_number=DEFAULT_GRAPHS_NUMBER):
+    def __init__(self, size_n=10, bisection_methods=None, graphs_number=DEFAULT_GRAPHS_NUMBER, seed=0, m=None,
+                 workers=None, cache_dir=None, graph_class=Graph, exact=False):
+        """
+        :param size_n: number of vertices
+        :param bisection_methods: Partitioning methods, e.g. Partitioning.kla
+        :param graphs_number: number of graphs
+        :param seed: seed of the first graph
+        :param m: number of edges, random for every graph if None
+        :param workers: number of worker processes, all cores if None
+        :param cache_dir: directory of cached graphs, created if it doesn't exist, None disables cache
+        :param graph_class: graph backend the methods run on
+        :param exact: compute optimal cuts by Partitioning.exact, practical for small sparse graphs only
+        """
+        super().__init__()
         if bisection_methods is None:
             self.fail("No bisection methods provided")
         self.bisection_methods = bisection_methods
         self.size_n = size_n
         self.graphs_number = graphs_number
+        self.seed = seed
+        self.m = m
+        self.workers = workers if workers is not None else os.cpu_count()
+        self.cache_dir = cache_dir
+        self.graph_class = graph_class
+        self.exact = exact
         self.costs_results = {}
-        for method in self.bisection_methods:
-            self.costs_results[method.__name__] = []
+        self.times_results = {}
         self.graphs = None
 
         self.graphs_edges = None
 
+    def __graph_path(self, seed):
+        if self.cache_dir is None:
+            return None
+        name = "quality_n{}_m{}_seed{}{}".format(self.size_n, self.m, seed, BINARY_EXTENSION)
+        return os.path.join(self.cache_dir, name)
+
+    def __map(self, function, tasks, initargs=()):
+        if self.workers == 1:
+            if initargs:
+                _init_quality_worker(*initargs)
+            return [function(task) for task in tasks]
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        chunksize = max(1, len(tasks) // (4 * self.workers))
+        with context.Pool(self.workers, _init_quality_worker if initargs else None, initargs) as pool:
+            return pool.map(function, tasks, chunksize)
+
+    def __get_method_names(self):
+        names = [method.__name__ for method in self.bisection_methods]
+        if self.exact and "exact" not in names:
+            names.append("exact")
+        return names
+
     def set_up(self):
-        self.graphs = []
-        for _ in range(self.graphs_number):
-            self.graphs.append(GraphGenerator.generate(self.size_n))
-        self.graphs_edges = []
-        for graph in self.graphs:
-            self.graphs_edges.append(graph.get_m())
+        if self.cache_dir is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        tasks = [(self.size_n, self.m, self.seed + i, self.__graph_path(self.seed + i))
+                 for i in range(self.graphs_number)]
+        self.graphs = [self.graph_class.from_edges(self.size_n, edges)
+                       for edges in self.__map(_quality_graph, tasks)]
+        self.graphs_edges = [graph.get_m() for graph in self.graphs]
+        self.costs_results = {name: [None] * self.graphs_number for name in self.__get_method_names()}
+        self.times_results = {name: [None] * self.graphs_number for name in self.__get_method_names()}
 
     def tear_down(self):
         print("\n============================")
+        print("n = {}, {} graphs, seed {}".format(self.size_n, self.graphs_number, self.seed))
         for test in self.costs_results.keys():
+            costs = [cost for cost in self.costs_results[test] if cost is not None]
+            times = [t for t in self.times_results[test] if t is not None]
+            if not costs:
+                continue
             print("\nFUNCTION {}".format(test))
-            print("Average:\t{}\tall:\t{}".format(mean(self.costs_results[test]), mean(self.graphs_edges)))
-            print("Std dev:\t{}".format(stdev(self.costs_results[test])))
+            print("Average:\t{}\tall:\t{}".format(mean(costs), mean(self.graphs_edges)))
+            print("Std dev:\t{}".format(stdev(costs) if len(costs) > 1 else 0.0))
+            print("Cost min / median / max:\t{} / {} / {}".format(min(costs), median(costs), max(costs)))
+            print("Time mean / median / max:\t{:.6f}s / {:.6f}s / {:.6f}s".format(mean(times), median(times),
+                                                                                  max(times)))
+            if self.exact and test != "exact":
+                self.__print_gaps(self.costs_results[test])
         print("============================")
 
+    def __print_gaps(self, costs):
+        pairs = [(cost, optimum) for cost, optimum in zip(costs, self.costs_results["exact"])
+                 if cost is not None and optimum is not None]
+        if not pairs:
+            return
+        gaps = [cost - optimum for cost, optimum in pairs]
+        relative = [(cost - optimum) / optimum for cost, optimum in pairs if optimum > 0]
+        print("Gap to optimum mean / max:\t{} / {}".format(mean(gaps), max(gaps)))
+        if relative:
+            print("Relative gap mean / max:\t{:.2%} / {:.2%}".format(mean(relative), max(relative)))
+        print("Optimal:\t{} of {}".format(gaps.count(0), len(gaps)))
+
     def test_basic_performance(self):
-        for method in self.bisection_methods:
-            for graph in self.graphs:
-                bis = Partitioning(graph)
-                getattr(bis, method.__name__)()
-                cost = bis.calc_cost()
-                self.costs_results[method.__name__].append(cost)
+        tasks = [(name, graph_number, self.seed + graph_number)
+                 for name in self.__get_method_names() for graph_number in range(self.graphs_number)]
+        for method, graph_number, cost, seconds in self.__map(_quality_cell, tasks, (self.graphs,)):
+            self.costs_results[method][graph_number] = cost
+            self.times_results[method][graph_number] = seconds
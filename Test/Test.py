@@ -25,7 +25,7 @@ class Test(ABC):
                 test_method()
             except Exception as e:
                 failed = True
-                self.results[test.__name__] = str(e)
+                self.results[test] = str(e)
             finally:
                 self.tear_down()
                 if not failed:
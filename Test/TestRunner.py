@@ -1,13 +1,19 @@
-from SpecificSizePerformanceTest import SpecificSizePerformanceTest
+from ScalingPerformanceTest import ScalingPerformanceTest
 from SpecificSizeQualityTest import SpecificSizeQualityTest
 from Partitioning import *
 
+import os
+import tempfile
+
 
 class TestRunner:
     def __init__(self):
         self.tests = [SpecificSizeQualityTest(30, bisection_methods=[Partitioning.sga, Partitioning.kla,
                                                                      Partitioning.rbha],
-                                              graphs_number=100)
+                                              graphs_number=100, seed=0, exact=True,
+                                              cache_dir=os.path.join(tempfile.gettempdir(), "quality_graphs")),
+                      ScalingPerformanceTest(bisection_methods=[Partitioning.kla, Partitioning.fm,
+                                                                Partitioning.multilevel])
                       ]
 
     def run(self):